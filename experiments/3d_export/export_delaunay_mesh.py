@@ -1,26 +1,35 @@
 #!/usr/bin/env python3
 """
-Export potential field data as Delaunay triangulated mesh (OBJ format).
+Export potential field data as Delaunay triangulated mesh (OBJ or PLY format).
 
 Uses scipy Delaunay triangulation to create a proper mesh from scattered points.
+An output path ending in .ply writes binary little-endian PLY (float32 vertices,
+uint32 indices), which is several times smaller and faster to write than OBJ.
 
-Usage: python3 export_delaunay_mesh.py <input_csv> <output.obj> [--transform TYPE] [--z-scale SCALE]
+With --decimate, points are thinned to one per grid cell before triangulating,
+so dense urban clusters do not inflate the triangle count. Cells are small
+enough that neighbouring survivors stay within the long-edge filter.
+
+Usage: python3 export_delaunay_mesh.py <input_csv> <output.obj|output.ply> [--transform TYPE] [--z-scale SCALE] [--decimate]
 """
 
 import sys
-import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.spatial import Delaunay
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io
 
 
 def load_potential_data(csv_path):
     """Load potential field data from CSV."""
     print(f"Loading data from {csv_path}...")
 
-    df = pd.read_csv(csv_path,
-                     names=['type', 'pop', 'lat', 'lon', 'potential'],
-                     dtype={'type': str, 'pop': float, 'lat': float, 'lon': float, 'potential': float})
+    # The string 'type' column is never used, so it is not parsed at all
+    df = io.load_potential_csv(csv_path, usecols=['pop', 'lat', 'lon', 'potential'],
+                               dtype=np.float64)
 
     print(f"Loaded {len(df)} data points")
     print(f"Potential range: {df['potential'].min():.0f} to {df['potential'].max():.0f}")
@@ -52,85 +61,130 @@ def transform_z(potentials, transform_type, z_scale):
     return z, label
 
 
-def export_delaunay_mesh(df, output_path, transform="log", z_scale=1.0, xy_scale=100.0):
-    """Export as OBJ with Delaunay triangulation."""
+def decimate_to_grid(points, cell):
+    """Return sorted indices keeping the first point in each cell x cell square."""
+    ij = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+    key = (ij[:, 0] << 32) | ij[:, 1]
+    _, keep = np.unique(key, return_index=True)
+    return np.sort(keep)
+
+
+def write_ply(output_path, vertices, faces, comments=()):
+    """Write a binary little-endian PLY: float32 vertices, uchar/uint32 face lists."""
+    face_records = np.empty(len(faces), dtype=[('n', 'u1'), ('v', '<u4', (3,))])
+    face_records['n'] = 3
+    face_records['v'] = faces
+
+    with open(output_path, 'wb') as f:
+        header = ["ply", "format binary_little_endian 1.0"]
+        header += [f"comment {c}" for c in comments]
+        header += [
+            f"element vertex {len(vertices)}",
+            "property float x",
+            "property float y",
+            "property float z",
+            f"element face {len(faces)}",
+            "property list uchar uint vertex_indices",
+            "end_header",
+        ]
+        f.write(("\n".join(header) + "\n").encode('utf-8'))
+        np.ascontiguousarray(vertices, dtype='<f4').tofile(f)
+        face_records.tofile(f)
+
+
+def export_delaunay_mesh(df, output_path, transform="log", z_scale=1.0, xy_scale=100.0,
+                         decimate=False):
+    """Export as OBJ (or binary PLY for a .ply path) with Delaunay triangulation."""
     print(f"\nExporting Delaunay mesh to {output_path}...")
     print(f"  Transform: {transform}")
     print(f"  Z-scale: {z_scale}")
     print(f"  XY-scale: {xy_scale}")
 
-    lons = df['lon'].values * xy_scale
-    lats = df['lat'].values * xy_scale
+    # Scaled (lon, lat) filled and scaled in place in the Delaunay input
+    # buffer; lons/lats are column views into it rather than separate copies
+    points_2d = np.empty((len(df), 2))
+    points_2d[:, 0] = df['lon'].values
+    points_2d[:, 1] = df['lat'].values
+    np.multiply(points_2d, xy_scale, out=points_2d)
+    lons, lats = points_2d.T
     potentials = df['potential'].values
 
+    # Triangles with long edges are dropped after triangulating (removes
+    # bay/water gaps). Convert miles to degrees (roughly 69 miles per
+    # degree), then scale
+    max_edge_miles = 5.0  # Remove triangles with edges > 5 miles
+    max_edge_degrees = max_edge_miles / 69.0
+    max_edge_length = max_edge_degrees * xy_scale
+
+    if decimate:
+        # First point wins in each cell. Survivors in adjacent cells can be
+        # up to 2*sqrt(2) cells apart, so this cell size keeps them within
+        # max_edge_length and the filter below drops no interior triangles
+        cell = max_edge_length / (2 * np.sqrt(2))
+        keep = decimate_to_grid(points_2d, cell)
+        print(f"  Decimated to {len(keep)} of {len(points_2d)} points "
+              f"({max_edge_miles / (2 * np.sqrt(2)):.2f} mile grid)")
+        points_2d = points_2d[keep]
+        lons, lats = points_2d.T
+        potentials = potentials[keep]
+
     # Transform Z values
     z_values, z_label = transform_z(potentials, transform, z_scale)
 
     print(f"  Z range after transform: {z_values.min():.2f} to {z_values.max():.2f}")
 
-    # Create 2D points for Delaunay triangulation (already scaled lon, lat)
+    # Delaunay triangulation of the (already scaled) lon, lat points, cached
+    # in output/.cache between runs
     print("\nComputing Delaunay triangulation...")
-    points_2d = np.column_stack((lons, lats))
-    tri = Delaunay(points_2d)
+    simplices = geometry.triangulate_cached(points_2d)
 
-    print(f"  Created {len(tri.simplices)} triangles")
+    print(f"  Created {len(simplices)} triangles")
 
-    # Filter out triangles with long edges (removes bay/water gaps)
-    # Convert miles to degrees (roughly 69 miles per degree), then scale
-    max_edge_miles = 5.0  # Remove triangles with edges > 5 miles
-    max_edge_degrees = max_edge_miles / 69.0
-    max_edge_length = max_edge_degrees * xy_scale
     print(f"  Filtering triangles with edges > {max_edge_miles:.1f} miles ({max_edge_degrees:.3f} degrees)...")
 
-    filtered_triangles = []
-    for triangle in tri.simplices:
-        # Get the three vertices
-        p0 = points_2d[triangle[0]]
-        p1 = points_2d[triangle[1]]
-        p2 = points_2d[triangle[2]]
-
-        # Calculate edge lengths
-        edge1 = np.linalg.norm(p1 - p0)
-        edge2 = np.linalg.norm(p2 - p1)
-        edge3 = np.linalg.norm(p0 - p2)
-
-        # Keep triangle only if all edges are short enough
-        if edge1 <= max_edge_length and edge2 <= max_edge_length and edge3 <= max_edge_length:
-            filtered_triangles.append(triangle)
-
-    filtered_triangles = np.array(filtered_triangles)
-    removed = len(tri.simplices) - len(filtered_triangles)
-    print(f"  Removed {removed} long-edge triangles ({100*removed/len(tri.simplices):.1f}%)")
+    # Squared edge lengths for all triangles at once: (T, 3, 2) vertices,
+    # each edge as the difference to the next vertex around the triangle
+    vertices = points_2d[simplices]
+    edges = vertices - vertices[:, [1, 2, 0], :]
+    edge_lengths_sq = np.einsum('tij,tij->ti', edges, edges)
+
+    # Keep triangle only if all edges are short enough
+    filtered_triangles = simplices[edge_lengths_sq.max(axis=1) <= max_edge_length ** 2]
+    removed = len(simplices) - len(filtered_triangles)
+    print(f"  Removed {removed} long-edge triangles ({100*removed/len(simplices):.1f}%)")
     print(f"  Kept {len(filtered_triangles)} triangles")
 
+    if Path(output_path).suffix.lower() == '.ply':
+        print(f"\nWriting binary PLY file...")
+        write_ply(output_path, np.column_stack((lons, lats, z_values)), filtered_triangles,
+                  comments=["Population Gravitational Potential Surface",
+                            f"Transform: {z_label}"])
+        print(f"\n✓ Exported {len(lons)} vertices, {len(filtered_triangles)} faces")
+        print("\nReady for Blender:")
+        print("  File → Import → Stanford (.ply)")
+        return
+
     # Write OBJ file
     print(f"\nWriting OBJ file...")
-    with open(output_path, 'w') as f:
+    with open(output_path, 'w', buffering=1 << 20) as f:
         f.write("# Population Gravitational Potential Surface\n")
         f.write(f"# Generated from Delaunay triangulation\n")
-        f.write(f"# Points: {len(df)}\n")
-        f.write(f"# Triangles: {len(tri.simplices)}\n")
+        f.write(f"# Points: {len(lons)}\n")
+        f.write(f"# Triangles: {len(simplices)}\n")
         f.write(f"# Transform: {z_label}\n\n")
 
         # Write vertices (v x y z)
-        for i, (lon, lat, z) in enumerate(zip(lons, lats, z_values)):
-            if i % 10000 == 0 and i > 0:
-                print(f"  Writing vertex {i}/{len(df)}...")
-            f.write(f"v {lon:.6f} {lat:.6f} {z:.6f}\n")
+        io.write_rows(f, np.column_stack((lons, lats, z_values)), 'v %.6f %.6f %.6f')
 
-        f.write(f"\n# {len(df)} vertices\n\n")
+        f.write(f"\n# {len(lons)} vertices\n\n")
 
         # Write faces (f v1 v2 v3) - use filtered triangles
         # OBJ is 1-indexed, so add 1 to each vertex index
-        for i, triangle in enumerate(filtered_triangles):
-            if i % 10000 == 0 and i > 0:
-                print(f"  Writing face {i}/{len(filtered_triangles)}...")
-            v1, v2, v3 = triangle + 1  # Convert to 1-indexed
-            f.write(f"f {v1} {v2} {v3}\n")
+        io.write_rows(f, filtered_triangles + 1, 'f %d %d %d')
 
         f.write(f"\n# {len(filtered_triangles)} faces\n")
 
-    print(f"\n✓ Exported {len(df)} vertices, {len(filtered_triangles)} faces")
+    print(f"\n✓ Exported {len(lons)} vertices, {len(filtered_triangles)} faces")
     print("\nReady for Blender:")
     print("  File → Import → Wavefront (.obj)")
     print("  The mesh is already triangulated and ready to render/print!")
@@ -140,13 +194,14 @@ def main():
     if len(sys.argv) < 3:
         print("ERROR: Missing arguments", file=sys.stderr)
         print(file=sys.stderr)
-        print("Usage: python3 export_delaunay_mesh.py <input_csv> <output.obj> [--transform TYPE] [--z-scale SCALE]", file=sys.stderr)
+        print("Usage: python3 export_delaunay_mesh.py <input_csv> <output.obj|output.ply> [--transform TYPE] [--z-scale SCALE] [--decimate]", file=sys.stderr)
         print(file=sys.stderr)
         print("Transform types: log (default), log2, sqrt, cbrt, raw", file=sys.stderr)
         print(file=sys.stderr)
         print("Examples:", file=sys.stderr)
         print("  python3 export_delaunay_mesh.py output/sf_bay_potential_d3_capped.csv output/sf_bay_mesh.obj", file=sys.stderr)
         print("  python3 export_delaunay_mesh.py output/usa.csv output/usa_mesh.obj --transform raw --z-scale 0.00001", file=sys.stderr)
+        print("  python3 export_delaunay_mesh.py output/usa.csv output/usa_mesh.ply  # binary PLY", file=sys.stderr)
         sys.exit(1)
 
     input_path = sys.argv[1]
@@ -155,6 +210,7 @@ def main():
     # Parse optional arguments
     transform = "log"
     z_scale = 1.0
+    decimate = False
 
     i = 3
     while i < len(sys.argv):
@@ -164,6 +220,9 @@ def main():
         elif sys.argv[i] == '--z-scale' and i + 1 < len(sys.argv):
             z_scale = float(sys.argv[i + 1])
             i += 2
+        elif sys.argv[i] == '--decimate':
+            decimate = True
+            i += 1
         else:
             print(f"WARNING: Unknown argument: {sys.argv[i]}", file=sys.stderr)
             i += 1
@@ -176,7 +235,7 @@ def main():
     df = load_potential_data(input_path)
 
     # Export
-    export_delaunay_mesh(df, output_path, transform, z_scale)
+    export_delaunay_mesh(df, output_path, transform, z_scale, decimate=decimate)
 
     print()
     print("="*60)
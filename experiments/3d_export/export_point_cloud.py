@@ -15,6 +15,11 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import io
+
 
 def load_potential_data(csv_path):
     """Load potential field data from CSV."""
@@ -61,17 +66,15 @@ def export_point_cloud_obj(df, output_path, transform="log", z_scale=1.0):
 
     print(f"  Z range after transform: {z_values.min():.2f} to {z_values.max():.2f}")
 
-    with open(output_path, 'w') as f:
+    print(f"  Writing {len(df)} vertices...")
+    with open(output_path, 'w', buffering=1 << 20) as f:
         f.write("# Population Gravitational Potential Point Cloud\n")
         f.write(f"# Points: {len(df)}\n")
         f.write(f"# Transform: {transform}\n")
         f.write(f"# Z-scale: {z_scale}\n\n")
 
-        # Write vertices
-        for i, (lon, lat, z) in enumerate(zip(lons, lats, z_values)):
-            if i % 10000 == 0:
-                print(f"  Writing vertex {i}/{len(df)}...")
-            f.write(f"v {lon:.6f} {lat:.6f} {z:.6f}\n")
+        # Write vertices (v x y z)
+        io.write_rows(f, np.column_stack((lons, lats, z_values)), 'v %.6f %.6f %.6f')
 
     print(f"✓ Exported {len(df)} vertices")
     print("\nTo use in Blender:")
@@ -11,20 +11,32 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def export_raw_obj(csv_path, output_path, z_scale=0.01, lon_range=None, lat_range=None):
-    """Export surface with raw Z values scaled by z_scale."""
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-    print(f"Loading {csv_path}...")
-    df = pd.read_csv(csv_path, names=['type', 'pop', 'lat', 'lon', 'potential'])
+from lib import io
 
-    # Reshape to grid
-    unique_lats = sorted(df['lat'].unique(), reverse=True)
-    unique_lons = sorted(df['lon'].unique())
-    nrows, ncols = len(unique_lats), len(unique_lons)
+def export_raw_obj(csv_path, output_path, z_scale=0.01, lon_range=None, lat_range=None, df=None):
+    """Export surface with raw Z values scaled by z_scale.
+
+    Pass an already-loaded df (lat, lon, potential columns) to skip reading csv_path.
+    """
+
+    if df is None:
+        print(f"Loading {csv_path}...")
+        df = pd.read_csv(csv_path, names=['type', 'pop', 'lat', 'lon', 'potential'])
+
+    # Reshape to grid (north to south, west to east): each point's row and
+    # column are its ranks among the unique lats and lons; cells with no
+    # point stay NaN
+    unique_lats, row_idx = np.unique(df['lat'].to_numpy(), return_inverse=True)
+    unique_lons, col_idx = np.unique(df['lon'].to_numpy(), return_inverse=True)
+    unique_lats = unique_lats[::-1]
+    row_idx = len(unique_lats) - 1 - row_idx
 
     lon_grid, lat_grid = np.meshgrid(unique_lons, unique_lats)
-    df_sorted = df.sort_values(['lat', 'lon'], ascending=[False, True])
-    potential_grid = df_sorted['potential'].values.reshape(nrows, ncols)
+    potential_grid = np.full(lon_grid.shape, np.nan)
+    potential_grid[row_idx, col_idx] = df['potential'].to_numpy()
 
     # Filter to region if specified
     if lon_range or lat_range:
@@ -55,41 +67,38 @@ def export_raw_obj(csv_path, output_path, z_scale=0.01, lon_range=None, lat_rang
     z_values = potential_grid * z_scale
     print(f"Z range after scaling: {z_values.min():.3f} to {z_values.max():.3f}")
 
+    # 1-based OBJ index of each valid grid point (row-major), 0 where missing
+    valid = ~np.isnan(z_values) & ~np.isnan(lon_grid)
+    vertex_idx = np.where(valid, np.cumsum(valid).reshape(valid.shape), 0)
+    vertex_count = int(valid.sum())
+
+    # Two triangles per grid cell whose four corners all exist
+    v1 = vertex_idx[:-1, :-1]
+    v2 = vertex_idx[:-1, 1:]
+    v3 = vertex_idx[1:, 1:]
+    v4 = vertex_idx[1:, :-1]
+    cell_ok = (v1 > 0) & (v2 > 0) & (v3 > 0) & (v4 > 0)
+    faces = np.stack((v1, v2, v3, v1, v3, v4), axis=-1)[cell_ok].reshape(-1, 3)
+    face_count = len(faces)
+
     # Write OBJ
     print(f"Writing {output_path}...")
-    with open(output_path, 'w') as f:
+    with open(output_path, 'w', buffering=1 << 20) as f:
         f.write("# Population Potential Surface (Raw Z-values)\n")
         f.write(f"# Z-scale: {z_scale} (raw potential × {z_scale})\n\n")
 
         # Write vertices
-        vertex_map = {}
-        v_idx = 1
-        for i in range(nrows):
-            for j in range(ncols):
-                if not np.isnan(z_values[i,j]) and not np.isnan(lon_grid[i,j]):
-                    f.write(f"v {lon_grid[i,j]:.6f} {lat_grid[i,j]:.6f} {z_values[i,j]:.6f}\n")
-                    vertex_map[(i,j)] = v_idx
-                    v_idx += 1
+        io.write_rows(f, np.column_stack((lon_grid[valid], lat_grid[valid], z_values[valid])),
+                      'v %.6f %.6f %.6f')
 
-        f.write(f"\n# {v_idx-1} vertices\n\n")
+        f.write(f"\n# {vertex_count} vertices\n\n")
 
         # Write faces
-        face_count = 0
-        for i in range(nrows-1):
-            for j in range(ncols-1):
-                if ((i,j) in vertex_map and (i,j+1) in vertex_map and
-                    (i+1,j+1) in vertex_map and (i+1,j) in vertex_map):
-                    v1 = vertex_map[(i,j)]
-                    v2 = vertex_map[(i,j+1)]
-                    v3 = vertex_map[(i+1,j+1)]
-                    v4 = vertex_map[(i+1,j)]
-                    f.write(f"f {v1} {v2} {v3}\n")
-                    f.write(f"f {v1} {v3} {v4}\n")
-                    face_count += 2
+        io.write_rows(f, faces, 'f %d %d %d')
 
         f.write(f"\n# {face_count} faces\n")
 
-    print(f"✓ Done! {v_idx-1} vertices, {face_count} faces")
+    print(f"✓ Done! {vertex_count} vertices, {face_count} faces")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -4,13 +4,18 @@ Export population potential surface as STL file for 3D printing.
 Uses linear Z scaling for printability.
 """
 
+import sys
 import numpy as np
-from scipy.spatial import Delaunay
-from stl import mesh
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io, print3d
 
 # Load USA natural data
 print("Loading USA natural potential data...")
-data = np.loadtxt('output/usa_natural/census_tract_potential.csv', delimiter=',', skiprows=1)
+data = io.load_numeric_csv('output/usa_natural/census_tract_potential.csv', skiprows=1, cache=True)
 lons = data[:, 0]
 lats = data[:, 1]
 potentials = data[:, 2]
@@ -20,10 +25,12 @@ print(f"Lon range: {lons.min():.2f} to {lons.max():.2f}")
 print(f"Lat range: {lats.min():.2f} to {lats.max():.2f}")
 print(f"Potential range: {potentials.min():.2e} to {potentials.max():.2e}")
 
-# Build triangulation
+# Build triangulation (Shewchuk's Triangle when installed; cached in
+# output/.cache between runs)
 print("Building Delaunay triangulation...")
-tri = Delaunay(np.column_stack((lons, lats)))
-print(f"Triangles: {len(tri.simplices):,}")
+faces = geometry.triangulate_cached(np.column_stack((lons, lats)),
+                                    backend='triangle' if geometry.HAS_TRIANGLE else 'qhull')
+print(f"Triangles: {len(faces):,}")
 
 # Normalize coordinates to fit on build plate
 # Bambu P1S build volume: 256mm x 256mm x 256mm
@@ -60,30 +67,16 @@ print(f"Max height: {z_mm.max():.1f} mm (fits in 256mm build height)")
 print("\nCreating STL mesh...")
 vertices = np.column_stack((x_mm, y_mm, z_mm))
 
-# Create faces from triangulation
-faces = tri.simplices
-
-# Create mesh object
-print(f"Creating mesh with {len(faces):,} triangles...")
-surface_mesh = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
-
-for i, face in enumerate(faces):
-    for j in range(3):
-        surface_mesh.vectors[i][j] = vertices[face[j]]
-
-    if i % 50000 == 0 and i > 0:
-        print(f"  Progress: {i:,} / {len(faces):,} ({100*i/len(faces):.1f}%)")
-
-# Save STL
+# Stream triangles to a binary STL in chunks
 output_path = 'output/usa_natural/usa_surface_9pct.stl'
-print(f"\nSaving to {output_path}...")
-surface_mesh.save(output_path)
+print(f"\nSaving {len(faces):,} triangles to {output_path}...")
+print3d.write_stl(output_path, vertices, faces)
 
 # Print statistics
 print(f"\nSTL Statistics:")
-print(f"  Triangles: {len(surface_mesh.vectors):,}")
+print(f"  Triangles: {len(faces):,}")
 print(f"  Vertices: ~{len(lons):,} unique points")
 print(f"  Dimensions: {x_mm.max():.1f} × {y_mm.max():.1f} × {z_mm.max():.1f} mm")
-print(f"  File size: {len(surface_mesh.data) * surface_mesh.data.itemsize / 1024 / 1024:.1f} MB")
+print(f"  File size: {Path(output_path).stat().st_size / 1024 / 1024:.1f} MB")
 print(f"\nReady for 3D printing on Bambu P1S!")
 print(f"Estimated print time: 8-12 hours at 0.2mm layer height")
@@ -13,10 +13,19 @@ Usage: python3 preview_3d_print.py [usa|world]
 
 import sys
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
 from pathlib import Path
 
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import io, print3d
+
+
+# Only the columns the preview uses, as float32 (~1 m at Earth scale is ample
+# for a print preview); halves memory and parse time on the world grid
+PREVIEW_COLUMNS = ['lat', 'lon', 'potential']
+
 
 def load_usa_data():
     """Load USA census tract data from existing computation."""
@@ -35,7 +44,7 @@ def load_usa_data():
             return None
 
     print(f"Loading USA data from {csv_path}...")
-    df = pd.read_csv(csv_path, names=['type', 'pop', 'lat', 'lon', 'potential'])
+    df = io.load_potential_csv(csv_path, usecols=PREVIEW_COLUMNS, dtype=np.float32)
 
     return df
 
@@ -49,7 +58,7 @@ def load_world_data():
         return None
 
     print(f"Loading world data from {csv_path}...")
-    df = pd.read_csv(csv_path, names=['type', 'pop', 'lat', 'lon', 'potential'])
+    df = io.load_potential_csv(csv_path, usecols=PREVIEW_COLUMNS, dtype=np.float32)
 
     return df
 
@@ -67,18 +76,15 @@ def create_print_preview(df, region_name, base_width_cm=25, base_height_cm=15, m
     """
 
     # Get unique coordinates and create grid
-    unique_lats = sorted(df['lat'].unique(), reverse=True)
-    unique_lons = sorted(df['lon'].unique())
+    unique_lats = np.unique(df['lat'].values)[::-1]
+    unique_lons = np.unique(df['lon'].values)
 
     nrows, ncols = len(unique_lats), len(unique_lons)
     print(f"Grid size: {nrows} × {ncols}")
 
-    # Create meshgrid
-    lon_grid, lat_grid = np.meshgrid(unique_lons, unique_lats)
-
-    # Reshape potential values
-    df_sorted = df.sort_values(['lat', 'lon'], ascending=[False, True])
-    potential_grid = df_sorted['potential'].values.reshape(nrows, ncols)
+    # Reshape potential values: rows by lat descending, columns by lon ascending
+    order = np.lexsort((df['lon'].values, -df['lat'].values))
+    potential_grid = df['potential'].values[order].reshape(nrows, ncols)
 
     # Get geographic bounds
     lon_min, lon_max = unique_lons[0], unique_lons[-1]
@@ -89,31 +95,16 @@ def create_print_preview(df, region_name, base_width_cm=25, base_height_cm=15, m
     print(f"Geographic bounds: Lon [{lon_min:.1f}, {lon_max:.1f}], Lat [{lat_min:.1f}, {lat_max:.1f}]")
     print(f"Potential range: {potential_grid.min():.2e} to {potential_grid.max():.2e}")
 
-    # Scale coordinates to print dimensions (in cm)
-    # We want to preserve aspect ratio
-    if lon_range > lat_range:
-        # Width-constrained
-        x_scale = base_width_cm / lon_range
-        y_scale = x_scale  # Keep aspect ratio
-        actual_height = lat_range * y_scale
-        actual_width = base_width_cm
-    else:
-        # Height-constrained
-        y_scale = base_height_cm / lat_range
-        x_scale = y_scale
-        actual_width = lon_range * x_scale
-        actual_height = base_height_cm
-
-    x_print = (lon_grid - lon_min) * x_scale
-    y_print = (lat_grid - lat_min) * y_scale
-
-    # Scale Z to max_z_cm
-    # Use the potential directly, normalized to max height
-    z_raw = potential_grid
-    z_min, z_max = z_raw.min(), z_raw.max()
-
-    # Normalize to 0-max_z_cm range
-    z_print = (z_raw - z_min) / (z_max - z_min) * max_z_cm
+    # Scale coordinates to print dimensions (in cm), preserving aspect ratio
+    scale, actual_width, actual_height = print3d.fit_to_base(
+        lon_range, lat_range, base_width_cm, base_height_cm)
+
+    # Scale the 1-D axes, then expand: meshgrid is the only full-size pass
+    x_print, y_print = np.meshgrid((unique_lons - lon_min) * scale,
+                                   (unique_lats - lat_min) * scale)
+
+    # Use the potential directly, normalized to 0-max_z_cm
+    z_print = print3d.normalize_height(potential_grid, max_z_cm)
 
     print(f"\nPrint dimensions:")
     print(f"  Base: {actual_width:.1f}cm × {actual_height:.1f}cm")
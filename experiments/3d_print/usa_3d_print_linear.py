@@ -1,24 +1,33 @@
 #!/usr/bin/env python3
 """
-Generate USA 1/d³ potential preview for 3D printing using pre-calculated data.
-Linear Z scale: 0-2cm, monochrome, 25×15cm base, triangle mesh.
+Generate USA 1/d³ potential mesh for 3D printing using pre-calculated data.
+Linear Z scale: 0-2cm, 25×15cm base, triangle mesh.
+
+Writes a binary STL (in mm) directly from the triangulation. Pass --preview
+to also write the monochrome Plotly HTML preview.
+
+Usage: python3 usa_3d_print_linear.py [--preview]
 """
 
-import pandas as pd
+import sys
 import numpy as np
-import plotly.graph_objects as go
-from scipy.spatial import Delaunay
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io, print3d
 
 print("Loading USA census tract 1/d³ potential data...")
-df = pd.read_csv('output/census_potential_d3.csv',
-                 names=['type', 'pop', 'lat', 'lon', 'potential'])
+df = io.load_potential_csv('output/census_potential_d3.csv',
+                           usecols=['lat', 'lon', 'potential'], dtype=np.float32)
 print(f"Loaded {len(df)} census tracts")
 
-# Create Delaunay triangulation
+# Create Delaunay triangulation (cached in output/.cache between runs)
 print("Computing Delaunay triangulation...")
 points = np.column_stack((df['lon'].values, df['lat'].values))
-tri = Delaunay(points)
-print(f"Created {len(tri.simplices)} triangles")
+simplices = geometry.triangulate_cached(points)
+print(f"Created {len(simplices)} triangles")
 
 # Get coordinates and potential
 lons = df['lon'].values
@@ -38,63 +47,71 @@ base_width_cm = 25.0
 base_height_cm = 15.0
 max_z_cm = 2.0
 
-aspect_ratio = lon_range / lat_range
-if aspect_ratio > (base_width_cm / base_height_cm):
-    actual_width = base_width_cm
-    actual_height = base_width_cm / aspect_ratio
-else:
-    actual_height = base_height_cm
-    actual_width = base_height_cm * aspect_ratio
-
-x_scale = actual_width / lon_range
-y_scale = actual_height / lat_range
+scale, actual_width, actual_height = print3d.fit_to_base(
+    lon_range, lat_range, base_width_cm, base_height_cm)
 
-x_cm = (lons - lon_min) * x_scale
-y_cm = (lats - lat_min) * y_scale
+x_cm = (lons - lon_min) * scale
+y_cm = (lats - lat_min) * scale
 
 # LINEAR Z scaling: 0 to 2cm
-z_min, z_max = potentials.min(), potentials.max()
-z_cm = (potentials - z_min) / (z_max - z_min) * max_z_cm
+z_cm = print3d.normalize_height(potentials, max_z_cm)
 
 print(f"\nPrint dimensions: {actual_width:.1f} × {actual_height:.1f} × {max_z_cm} cm")
 print(f"Z aspect: {max_z_cm/actual_width*100:.1f}%")
 
-# Create mesh surface - MONOCHROME
-fig = go.Figure(data=[
-    go.Mesh3d(
-        x=x_cm,
-        y=y_cm,
-        z=z_cm,
-        i=tri.simplices[:, 0],
-        j=tri.simplices[:, 1],
-        k=tri.simplices[:, 2],
-        intensity=z_cm,
-        colorscale='Greys',  # Monochrome
-        showscale=True,
-        colorbar=dict(title="Height (cm)"),
-        hovertemplate='X: %{x:.2f}cm<br>Y: %{y:.2f}cm<br>Z: %{z:.3f}cm<extra></extra>',
-        lighting=dict(ambient=0.5, diffuse=0.8, specular=0.2),
-        flatshading=False
+# Binary STL straight from the triangulation (slicers assume mm)
+vertices_mm = np.column_stack((x_cm, y_cm, z_cm)) * 10.0
+
+stl_path = 'output/usa_3d_print_linear.stl'
+print(f"\nSaving to {stl_path}...")
+print3d.write_stl(stl_path, vertices_mm, simplices)
+print(f"✓ Done! ({len(simplices):,} triangles)")
+
+if '--preview' in sys.argv[1:]:
+    import plotly.graph_objects as go
+
+    # Merge vertices on a 1 mm grid so the HTML stays light enough for the
+    # browser; the STL above keeps the full mesh
+    preview_vertices, preview_faces = print3d.decimate_mesh(
+        np.column_stack((x_cm, y_cm, z_cm)), simplices, cell_size=0.1)
+    print(f"\nPreview mesh: {len(preview_faces):,} of {len(simplices):,} triangles")
+
+    # Create mesh surface - MONOCHROME
+    fig = go.Figure(data=[
+        go.Mesh3d(
+            x=preview_vertices[:, 0],
+            y=preview_vertices[:, 1],
+            z=preview_vertices[:, 2],
+            i=preview_faces[:, 0],
+            j=preview_faces[:, 1],
+            k=preview_faces[:, 2],
+            intensity=preview_vertices[:, 2],
+            colorscale='Greys',  # Monochrome
+            showscale=True,
+            colorbar=dict(title="Height (cm)"),
+            hovertemplate='X: %{x:.2f}cm<br>Y: %{y:.2f}cm<br>Z: %{z:.3f}cm<extra></extra>',
+            lighting=dict(ambient=0.5, diffuse=0.8, specular=0.2),
+            flatshading=False
+        )
+    ])
+
+    fig.update_layout(
+        title=f"USA Population Potential - 3D Print Preview<br>" +
+              f"<sub>1/d⁴ force (1/d³ potential) | {actual_width:.1f}×{actual_height:.1f}×{max_z_cm}cm | Linear Z scale</sub>",
+        scene=dict(
+            xaxis=dict(title='Width (cm)'),
+            yaxis=dict(title='Depth (cm)'),
+            zaxis=dict(title='Height (cm)'),
+            aspectmode='data',
+            camera=dict(eye=dict(x=1.5, y=1.5, z=1.0)),
+            bgcolor='white'
+        ),
+        width=1400,
+        height=900
     )
-])
-
-fig.update_layout(
-    title=f"USA Population Potential - 3D Print Preview<br>" +
-          f"<sub>1/d⁴ force (1/d³ potential) | {actual_width:.1f}×{actual_height:.1f}×{max_z_cm}cm | Linear Z scale</sub>",
-    scene=dict(
-        xaxis=dict(title='Width (cm)'),
-        yaxis=dict(title='Depth (cm)'),
-        zaxis=dict(title='Height (cm)'),
-        aspectmode='data',
-        camera=dict(eye=dict(x=1.5, y=1.5, z=1.0)),
-        bgcolor='white'
-    ),
-    width=1400,
-    height=900
-)
-
-output_path = 'output/usa_3d_print_linear.html'
-print(f"\nSaving to {output_path}...")
-fig.write_html(output_path)
-print(f"✓ Done!")
-print(f"\nOpen: {output_path}")
+
+    output_path = 'output/usa_3d_print_linear.html'
+    print(f"\nSaving to {output_path}...")
+    fig.write_html(output_path, include_plotlyjs='cdn')
+    print(f"✓ Done!")
+    print(f"\nOpen: {output_path}")
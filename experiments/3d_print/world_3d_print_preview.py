@@ -91,6 +91,6 @@ fig.update_layout(
 
 output_path = 'output/world_3d_print_preview.html'
 print(f"\nSaving to {output_path}...")
-fig.write_html(output_path)
+fig.write_html(output_path, include_plotlyjs='cdn')
 print(f"✓ Done!")
 print(f"\nOpen: {output_path}")
@@ -6,8 +6,9 @@ Reads an HTML file, adds annotations, and saves a new version.
 Usage: python3 add_annotations.py <input.html> <output.html>
 """
 
-import sys
+import json
 import re
+import sys
 from pathlib import Path
 
 
@@ -34,33 +35,13 @@ def add_world_annotations(html_content):
         (45.0, 25.0, "Empty Quarter<br>Desert", "orange"),
     ]
 
-    # Build Plotly annotation JSON
-    annotation_json = "[\n"
-    for lon, lat, text, color in annotations:
-        annotation_json += f"""        {{
-            x: {lon},
-            y: {lat},
-            text: "{text}",
-            showarrow: true,
-            arrowhead: 2,
-            arrowsize: 1,
-            arrowwidth: 2,
-            arrowcolor: "{color}",
-            ax: 40,
-            ay: -40,
-            font: {{
-                size: 12,
-                color: "{color}",
-                family: "Arial, sans-serif"
-            }},
-            bgcolor: "rgba(0,0,0,0.7)",
-            bordercolor: "{color}",
-            borderwidth: 1,
-            borderpad: 4
-        }},\n"""
-    annotation_json += "    ]"
-
-    return annotation_json
+    return [dict(x=lon, y=lat, text=text, showarrow=True,
+                 arrowhead=2, arrowsize=1, arrowwidth=2, arrowcolor=color,
+                 ax=40, ay=-40,
+                 font=dict(size=12, color=color, family="Arial, sans-serif"),
+                 bgcolor="rgba(0,0,0,0.7)", bordercolor=color,
+                 borderwidth=1, borderpad=4)
+            for lon, lat, text, color in annotations]
 
 
 def add_usa_annotations(html_content):
@@ -81,27 +62,62 @@ def add_usa_annotations(html_content):
         (-100.0, 45.0, "Northern Plains<br>(Low Potential)", "orange"),
     ]
 
-    annotation_json = "[\n"
-    for lon, lat, text, color in annotations:
-        annotation_json += f"""        {{
-            x: {lon},
-            y: {lat},
-            text: "{text}",
-            showarrow: true,
-            arrowhead: 2,
-            ax: 30,
-            ay: -30,
-            font: {{
-                size: 11,
-                color: "{color}"
-            }},
-            bgcolor: "rgba(0,0,0,0.7)",
-            bordercolor: "{color}",
-            borderwidth: 1
-        }},\n"""
-    annotation_json += "    ]"
-
-    return annotation_json
+    return [dict(x=lon, y=lat, text=text, showarrow=True,
+                 arrowhead=2, ax=30, ay=-30,
+                 font=dict(size=11, color=color),
+                 bgcolor="rgba(0,0,0,0.7)", bordercolor=color, borderwidth=1)
+            for lon, lat, text, color in annotations]
+
+
+def find_closing_bracket(text, start):
+    """Return the index of the bracket closing the one at text[start].
+
+    Brackets inside quoted strings are skipped, so this is a single linear
+    scan even over multi-MB embedded JSON.
+    """
+    depth = 0
+    quote = None
+    i = start
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in '"\'':
+            quote = c
+        elif c in '{[':
+            depth += 1
+        elif c in '}]':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced brackets in HTML")
+
+
+def find_layout(html_content):
+    """Return the (start, end) span of the layout object literal, or None.
+
+    Handles both `var layout = {...}` and the layout argument of
+    `Plotly.newPlot(id, [data], {layout}, ...)` written by fig.write_html().
+    """
+    match = re.search(r'var\s+layout\s*=\s*\{', html_content)
+    if match:
+        start = match.end() - 1
+        return start, find_closing_bracket(html_content, start)
+
+    call = html_content.find('Plotly.newPlot(')
+    if call < 0:
+        return None
+    data_start = html_content.find('[', call)
+    if data_start < 0:
+        return None
+    start = html_content.find('{', find_closing_bracket(html_content, data_start))
+    if start < 0:
+        return None
+    return start, find_closing_bracket(html_content, start)
 
 
 def inject_annotations(html_content, annotation_type='world'):
@@ -109,45 +125,44 @@ def inject_annotations(html_content, annotation_type='world'):
 
     # Generate appropriate annotations
     if annotation_type == 'usa':
-        annotations_json = add_usa_annotations(html_content)
+        annotations = add_usa_annotations(html_content)
     else:
-        annotations_json = add_world_annotations(html_content)
-
-    # Find the Plotly.newPlot call and inject annotations
-    # Look for the layout object
-    pattern = r'(var\s+layout\s*=\s*\{[^}]*)(}\s*;)'
-
-    def add_annotations_to_layout(match):
-        layout_start = match.group(1)
-        layout_end = match.group(2)
-
-        # Check if annotations already exist
-        if 'annotations' in layout_start:
-            print("Warning: Annotations already exist in this file")
-            return match.group(0)
-
-        # Add annotations before the closing brace
-        return f"{layout_start},\n    annotations: {annotations_json}{layout_end}"
-
-    # Try to inject
-    modified_html = re.sub(pattern, add_annotations_to_layout, html_content, flags=re.DOTALL)
-
-    # If that didn't work, try alternative pattern
-    if modified_html == html_content:
-        # Look for scene object instead (for 3D plots)
-        pattern2 = r'(scene\s*:\s*\{[^}]*)(}\s*,)'
-        # For 3D plots, we need to add scene.annotations
-        # Actually, Plotly 3D doesn't support annotations the same way
+        annotations = add_world_annotations(html_content)
+
+    # Locate the layout object and parse it as JSON
+    span = find_layout(html_content)
+    if span is None:
+        print("Warning: No Plotly layout found")
+        return html_content
+    start, end = span
+    try:
+        layout = json.loads(html_content[start:end + 1])
+    except json.JSONDecodeError:
+        print("Warning: Plotly layout is not plain JSON, leaving file unchanged")
+        return html_content
+
+    if 'annotations' in layout:
+        print("Warning: Annotations already exist in this file")
+        return html_content
+
+    # Trace data sits between Plotly.newPlot( and the layout argument
+    plot_call = html_content.rfind('Plotly.newPlot(', 0, start)
+    traces = html_content[plot_call:start] if plot_call >= 0 else ''
+    is_3d = 'scene' in layout or re.search(
+        r'"type":\s*"(mesh3d|surface|scatter3d)"', traces) is not None
+
+    if is_3d:
+        # Plotly 3D doesn't support annotations the same way
         # Let's add a title instead
         if 'world' in html_content.lower() or 'usa' in html_content.lower():
-            pattern3 = r'(var\s+layout\s*=\s*\{)'
-            modified_html = re.sub(
-                pattern3,
-                r'\1\n    title: {text: "Population Potential Field - Height shows gravitational pull of nearby populations", font: {size: 16}},',
-                html_content
-            )
-
-    return modified_html
+            layout['title'] = {
+                'text': "Population Potential Field - Height shows gravitational pull of nearby populations",
+                'font': {'size': 16},
+            }
+    else:
+        layout['annotations'] = annotations
+
+    return html_content[:start] + json.dumps(layout) + html_content[end + 1:]
 
 
 def main():
@@ -6,15 +6,26 @@ Asks Claude to pick the nicest/best visualization based on aesthetic criteria.
 
 import anthropic
 import base64
+import mmap
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    # SIMD (SSSE3/AVX2) base64, several times faster than the stdlib codec
+    import pybase64
+except ImportError:
+    pybase64 = None
+
 
 def encode_image(image_path):
-    """Encode an image file to base64."""
+    """Encode an image file to base64 (memory-mapped, no intermediate bytes copy)."""
     with open(image_path, "rb") as image_file:
-        return base64.standard_b64encode(image_file.read()).decode("utf-8")
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if pybase64 is not None:
+                return pybase64.b64encode_as_string(data)
+            return base64.standard_b64encode(data).decode("utf-8")
 
 
 def get_image_media_type(image_path):
@@ -66,12 +77,16 @@ def evaluate_images(image_folder, criteria=None):
         print(f"  - {img.name}")
     print()
 
+    # Read and encode in parallel (file IO and b64encode release the GIL);
+    # map() keeps the results in sorted file order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        encoded_images = list(executor.map(encode_image, image_files))
+
     # Build the message content with all images
     content = []
 
     # Add each image
-    for i, image_path in enumerate(image_files, 1):
-        image_data = encode_image(image_path)
+    for i, (image_path, image_data) in enumerate(zip(image_files, encoded_images), 1):
         media_type = get_image_media_type(image_path)
 
         content.append({
@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
-"""Generate all regional OBJ files with raw Z-values."""
+"""Generate all regional OBJ files with raw Z-values.
 
+The CSV is read once; each region's subset is exported in its own process.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / '3d_export'))
+
 from export_raw_z_obj import export_raw_obj
 
 # Path to the potential data CSV
@@ -9,7 +19,6 @@ csv_path = Path.home() / "git/gridded/res/potential_1_over_d3_selfexclude/raw_po
 
 # Output directory
 output_dir = Path("output/obj")
-output_dir.mkdir(parents=True, exist_ok=True)
 
 # Z-scale factor (0.001 = 0.1% of raw potential)
 z_scale = 0.001
@@ -36,15 +45,10 @@ models = [
     },
 ]
 
-print("="*60)
-print("GENERATING RAW Z-VALUE REGIONAL OBJ FILES")
-print(f"Z-scale: {z_scale} (raw potential × {z_scale})")
-print("="*60)
 
-for model in models:
-    print(f"\n{'='*60}")
+def export_model(model, df):
+    """Export one region from its pre-filtered rows (runs in a worker process)."""
     print(f"{model['name']}: {model['description']}")
-    print(f"{'='*60}")
 
     output_path = output_dir / f"{model['name']}.obj"
 
@@ -53,11 +57,36 @@ for model in models:
         output_path,
         z_scale=z_scale,
         lon_range=model.get('lon_range'),
-        lat_range=model.get('lat_range')
+        lat_range=model.get('lat_range'),
+        df=df
     )
+    return model['name']
+
+
+def main():
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("="*60)
+    print("GENERATING RAW Z-VALUE REGIONAL OBJ FILES")
+    print(f"Z-scale: {z_scale} (raw potential × {z_scale})")
+    print("="*60)
+
+    print(f"Loading {csv_path}...")
+    df = pd.read_csv(csv_path, names=['type', 'pop', 'lat', 'lon', 'potential'],
+                     usecols=['lat', 'lon', 'potential'])
+
+    # Ship each worker only its region's rows rather than the whole grid
+    subsets = [df[df['lon'].between(*model['lon_range']) & df['lat'].between(*model['lat_range'])]
+               for model in models]
+
+    with ProcessPoolExecutor(max_workers=len(models)) as executor:
+        for name in executor.map(export_model, models, subsets):
+            print(f"✓ {name}.obj complete")
+
+    print("\n" + "="*60)
+    print("ALL REGIONAL MODELS COMPLETE")
+    print("="*60)
 
-    print(f"✓ {model['name']}.obj complete\n")
 
-print("\n" + "="*60)
-print("ALL REGIONAL MODELS COMPLETE")
-print("="*60)
+if __name__ == "__main__":
+    main()
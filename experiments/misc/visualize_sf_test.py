@@ -2,8 +2,7 @@
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
-from lib import io, potential
+from lib import io, potential, geometry
 
 # Load SF Bay data
 print('Loading SF Bay data...')
@@ -11,30 +10,34 @@ df = io.load_csv('res/tracts_sf_bay.csv')
 lons = df['LONGITUDE'].values
 lats = df['LATITUDE'].values
 weights = df['POPULATION'].values
-avg_lat = np.mean(lats)
 
-# Calculate potential at census tracts (excluding self)
+# Calculate potential at census tracts
+# Bay Area spans ~1 degree of latitude, so cos-corrected distance is plenty
 print('Calculating potential...')
 potentials = potential.calculate_potential_chunked(
-    lons, lats, lons, lats, weights, avg_lat, force_exponent=3
+    lons, lats, lons, lats, weights,
+    geometry.cos_corrected_distance,
+    force_exponent=3,
+    min_distance_miles=0.5  # Required when sampling at source points
 )
 
 print(f'Potential range: {potentials.min():.0f} to {potentials.max():.0f}')
 
-# Create triangulation for visualization
+# Create triangulation for visualization (cached in output/.cache between runs)
 print('Creating triangulation...')
 points = np.column_stack((lons, lats))
-tri = Delaunay(points)
+simplices = geometry.triangulate_cached(points)
 
 # Create 3D mesh
 z_raw = potentials
-color_log = np.log10(potentials + 1)
+color_log = potentials + 1
+np.log10(color_log, out=color_log)
 
 fig = go.Figure(data=[go.Mesh3d(
     x=lons, y=lats, z=z_raw,
-    i=tri.simplices[:,0],
-    j=tri.simplices[:,1],
-    k=tri.simplices[:,2],
+    i=simplices[:,0],
+    j=simplices[:,1],
+    k=simplices[:,2],
     colorscale='Viridis',
     intensity=color_log,
     colorbar=dict(title='log₁₀(Potential)'),
@@ -43,9 +46,11 @@ fig = go.Figure(data=[go.Mesh3d(
 )])
 
 # Aspect ratio
-cos_avg_lat = np.cos(np.radians(avg_lat))
+# (the mid-latitude of the extent is close enough to scale longitude)
+lat_min, lat_max = lats.min(), lats.max()
+cos_avg_lat = np.cos(np.radians(0.5 * (lat_min + lat_max)))
 lon_range = lons.max() - lons.min()
-lat_range = lats.max() - lats.min()
+lat_range = lat_max - lat_min
 aspect_x = lon_range * cos_avg_lat / lat_range
 z_aspect = 0.3
 
@@ -4,15 +4,49 @@ Extract ridgeline from population potential surface.
 Find the continuous high-density spine of urban regions.
 """
 
+import sys
 import numpy as np
 import pandas as pd
-from scipy.spatial import Delaunay
-from scipy.ndimage import label
+from pathlib import Path
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 import plotly.graph_objects as go
+from numba import njit
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io
+
+
+@njit(cache=True)
+def greedy_ridge(indptr, indices, potentials, start, in_component, max_len):
+    """Walk from start to the highest unvisited in-component neighbor until stuck or max_len points."""
+    visited = np.zeros(len(potentials), dtype=np.bool_)
+    ridge = np.empty(max_len, dtype=np.int64)
+    ridge[0] = start
+    visited[start] = True
+    length = 1
+    current = start
+    while length < max_len:
+        best = -1
+        for k in range(indptr[current], indptr[current + 1]):
+            v = indices[k]
+            if in_component[v] and not visited[v]:
+                if best < 0 or potentials[v] > potentials[best]:
+                    best = v
+        if best < 0:
+            break
+        ridge[length] = best
+        visited[best] = True
+        length += 1
+        current = best
+    return ridge[:length]
+
 
 # Load USA natural data
 print("Loading USA natural potential data...")
-data = np.loadtxt('output/usa_natural/census_tract_potential.csv', delimiter=',', skiprows=1)
+data = io.load_numeric_csv('output/usa_natural/census_tract_potential.csv', skiprows=1, cache=True)
 lons = data[:, 0]
 lats = data[:, 1]
 potentials = data[:, 2]
@@ -22,16 +56,13 @@ print(f"Potential range: {potentials.min():.2e} to {potentials.max():.2e}")
 
 # Build triangulation for connectivity
 print("Building triangulation...")
-tri = Delaunay(np.column_stack((lons, lats)))
+tri = geometry.triangulate(np.column_stack((lons, lats)))
 
-# Build adjacency graph
+# Build adjacency graph (CSR: neighbors of k are indices[indptr[k]:indptr[k + 1]])
 print("Building adjacency graph...")
-adjacency = [set() for _ in range(len(lons))]
-for simplex in tri.simplices:
-    for i in range(3):
-        for j in range(3):
-            if i != j:
-                adjacency[simplex[i]].add(simplex[j])
+indptr, indices = tri.vertex_neighbor_vertices
+adjacency = csr_matrix((np.ones(len(indices), dtype=bool), indices, indptr),
+                       shape=(len(lons), len(lons)))
 
 # Find high-potential threshold (e.g., top 5%)
 threshold_percentile = 95
@@ -45,29 +76,14 @@ print(f"High-potential points: {len(high_potential_indices):,} ({100*len(high_po
 
 # Find connected components of high-potential regions
 print("\nFinding connected components...")
-visited = set()
-components = []
-
-for start_idx in high_potential_indices:
-    if start_idx in visited:
-        continue
-
-    # BFS to find connected component
-    component = []
-    queue = [start_idx]
-    visited.add(start_idx)
-
-    while queue:
-        current = queue.pop(0)
-        component.append(current)
-
-        # Check neighbors
-        for neighbor in adjacency[current]:
-            if neighbor not in visited and high_potential_mask[neighbor]:
-                visited.add(neighbor)
-                queue.append(neighbor)
+high_graph = adjacency[high_potential_indices][:, high_potential_indices]
+num_components, labels = connected_components(high_graph, directed=False)
 
-    components.append(component)
+# Point indices of each component, in label order (labels are assigned
+# in order of each component's lowest point index)
+order = np.argsort(labels, kind='stable')
+boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+components = np.split(high_potential_indices[order], boundaries)
 
 # Sort components by size
 components.sort(key=len, reverse=True)
@@ -93,34 +109,13 @@ for comp_idx, component in enumerate(components[:5]):  # Top 5 regions
     comp_potentials = potentials[comp_array]
     sorted_indices = np.argsort(comp_potentials)[::-1]
 
-    # Start from highest point
-    ridgeline = [comp_array[sorted_indices[0]]]
+    in_component = np.zeros(len(lons), dtype=bool)
+    in_component[comp_array] = True
 
-    # Greedily follow highest neighbors
-    current = ridgeline[0]
-    visited_ridge = {current}
-
-    while True:
-        # Find unvisited neighbors in the component
-        candidates = []
-        for neighbor in adjacency[current]:
-            if neighbor in visited_ridge:
-                continue
-            if neighbor in comp_array:
-                candidates.append(neighbor)
-
-        if not candidates:
-            break
-
-        # Pick highest potential neighbor
-        best = max(candidates, key=lambda x: potentials[x])
-        ridgeline.append(best)
-        visited_ridge.add(best)
-        current = best
-
-        # Don't make ridgeline too long
-        if len(ridgeline) > 100:
-            break
+    # Start from highest point and greedily follow highest neighbors,
+    # capped at 101 points so the ridgeline doesn't get too long
+    ridgeline = greedy_ridge(indptr, indices, potentials,
+                             comp_array[sorted_indices[0]], in_component, 101)
 
     ridgelines.append(ridgeline)
     print(f"  Region {comp_idx+1}: ridgeline with {len(ridgeline)} points")
@@ -129,14 +124,17 @@ for comp_idx, component in enumerate(components[:5]):  # Top 5 regions
 print("\nCreating visualization...")
 fig = go.Figure()
 
-# Add all points as scatter
-fig.add_trace(go.Scatter(
-    x=lons,
-    y=lats,
+# Add all points as scatter. They are only context for the ridgelines, so
+# plot every step-th point (at most ~50k) with WebGL; float32 halves the
+# embedded arrays and ~7 digits is plenty for plotting
+step = max(1, len(lons) // 50_000)
+fig.add_trace(go.Scattergl(
+    x=lons[::step].astype(np.float32),
+    y=lats[::step].astype(np.float32),
     mode='markers',
     marker=dict(
         size=2,
-        color=np.log10(potentials + 1),
+        color=np.log10(potentials[::step] + 1).astype(np.float32),
         colorscale='Viridis',
         opacity=0.3,
         showscale=True,
@@ -149,11 +147,11 @@ fig.add_trace(go.Scatter(
 # Add ridgelines
 colors = ['red', 'orange', 'yellow', 'cyan', 'magenta']
 for i, ridgeline in enumerate(ridgelines):
-    ridge_lons = lons[ridgeline]
-    ridge_lats = lats[ridgeline]
+    # One row gather gives (lon, lat, potential) for the whole ridge
+    ridge_data = data[ridgeline]
     fig.add_trace(go.Scatter(
-        x=ridge_lons,
-        y=ridge_lats,
+        x=ridge_data[:, 0],
+        y=ridge_data[:, 1],
         mode='lines+markers',
         line=dict(color=colors[i % len(colors)], width=3),
         marker=dict(size=6, color=colors[i % len(colors)]),
@@ -177,7 +175,7 @@ print(f"Done! Open with: open {output_path}")
 # Save ridgeline data
 print("\nSaving ridgeline coordinates...")
 for i, ridgeline in enumerate(ridgelines):
-    ridge_data = np.column_stack((lons[ridgeline], lats[ridgeline], potentials[ridgeline]))
+    ridge_data = data[ridgeline]
     output_csv = f'output/usa_natural/ridgeline_{i+1}.csv'
     np.savetxt(output_csv, ridge_data, delimiter=',',
                header='longitude,latitude,potential', comments='',
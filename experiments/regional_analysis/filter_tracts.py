@@ -12,10 +12,23 @@ Examples:
     python3 filter_tracts.py res/censusTracts.csv --list
 """
 
+import mmap
+import os
+import shutil
 import sys
-import csv
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import compress
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+# Bytes read and parsed per step within a worker's block; bounds memory on
+# the full 'all' extract
+READ_BYTES = 64 << 20
+
 # Predefined bounding boxes: (lon_min, lon_max, lat_min, lat_max)
 REGIONS = {
     # Small test regions (~100-300 tracts) - seconds to compute
@@ -49,34 +62,94 @@ REGIONS = {
 }
 
 
-def filter_by_bbox(input_path: str, lon_min: float, lon_max: float,
-                   lat_min: float, lat_max: float, output_path: str) -> None:
-    """Filter CSV by bounding box."""
+def in_bbox(lon: np.ndarray, lat: np.ndarray, bbox: tuple) -> np.ndarray:
+    """Return a mask of the points inside bbox = (lon_min, lon_max, lat_min, lat_max)."""
+    lon_min, lon_max, lat_min, lat_max = bbox
+    return (lon >= lon_min) & (lon <= lon_max) & (lat >= lat_min) & (lat <= lat_max)
+
+
+def split_blocks(input_path: str, n_blocks: int) -> list:
+    """Split the rows after the header into byte ranges ending on newlines."""
+    with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        first = mm.find(b'\n') + 1 or size
+        bounds = [first]
+        for k in range(1, n_blocks):
+            offset = max(first + (size - first) * k // n_blocks, bounds[-1])
+            newline = mm.find(b'\n', offset)
+            bounds.append(size if newline < 0 else newline + 1)
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
 
-    print(f"Filtering {input_path}...")
-    print(f"  Bounding box: lon [{lon_min}, {lon_max}], lat [{lat_min}, {lat_max}]")
 
+def filter_block(input_path: str, start: int, end: int, bbox: tuple,
+                 output_path: str) -> tuple:
+    """Copy the rows in bytes [start, end) that fall inside bbox; return (in, out) counts."""
     count_in = 0
     count_out = 0
 
-    with open(input_path, 'r') as infile, open(output_path, 'w') as outfile:
-        reader = csv.reader(infile)
-        writer = csv.writer(outfile)
+    with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+        infile.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            # Read whole lines only: top up a partial read to the next newline
+            buf = infile.read(min(READ_BYTES, remaining))
+            if len(buf) < remaining and not buf.endswith(b'\n'):
+                buf += infile.readline()
+            remaining -= len(buf)
 
-        # Copy header
-        header = next(reader)
-        writer.writerow(header)
+            # Blank lines are dropped before parsing so the mask lines up
+            # with the rows (read_csv would skip them, splitlines keeps them)
+            lines = [line for line in buf.splitlines(keepends=True) if line.strip()]
+            if not lines:
+                continue
 
-        # Filter rows
-        for row in reader:
-            count_in += 1
+            # Only the first two columns (lon, lat) are parsed, by the C
+            # parser; rows inside the box are copied through as raw bytes
+            coords = pd.read_csv(BytesIO(b''.join(lines)), header=None, usecols=[0, 1],
+                                 dtype=np.float64, engine='c')
+            inside = in_bbox(coords.iloc[:, 0].to_numpy(), coords.iloc[:, 1].to_numpy(), bbox)
 
-            lon = float(row[0])
-            lat = float(row[1])
+            outfile.writelines(compress(lines, inside))
+            count_in += len(coords)
+            count_out += int(inside.sum())
+
+    return count_in, count_out
+
+
+def filter_by_bbox(input_path: str, lon_min: float, lon_max: float,
+                   lat_min: float, lat_max: float, output_path: str) -> None:
+    """Filter CSV by bounding box."""
+
+    print(f"Filtering {input_path}...")
+    print(f"  Bounding box: lon [{lon_min}, {lon_max}], lat [{lat_min}, {lat_max}]")
 
-            if lon_min <= lon <= lon_max and lat_min <= lat <= lat_max:
-                writer.writerow(row)
-                count_out += 1
+    # Each worker filters one newline-aligned byte range into its own part
+    # file; the parts are then concatenated in order after the header. Small
+    # inputs get fewer workers: one per READ_BYTES of file, up to the CPU count
+    n_blocks = min(os.cpu_count() or 1, -(-os.path.getsize(input_path) // READ_BYTES))
+    blocks = split_blocks(input_path, max(n_blocks, 1))
+    bbox = (lon_min, lon_max, lat_min, lat_max)
+
+    with tempfile.TemporaryDirectory(dir=Path(output_path).parent) as tmp_dir:
+        part_paths = [os.path.join(tmp_dir, f'part{k}.csv') for k in range(len(blocks))]
+        with ProcessPoolExecutor(max_workers=max(len(blocks), 1)) as executor:
+            counts = list(executor.map(filter_block,
+                                       [input_path] * len(blocks),
+                                       [start for start, _ in blocks],
+                                       [end for _, end in blocks],
+                                       [bbox] * len(blocks),
+                                       part_paths))
+
+        with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+            # Copy header
+            outfile.write(infile.readline())
+            for part_path in part_paths:
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, outfile)
+
+    count_in = sum(c[0] for c in counts)
+    count_out = sum(c[1] for c in counts)
 
     print(f"  Input: {count_in} tracts")
     print(f"  Output: {count_out} tracts ({100*count_out/count_in:.1f}%)")
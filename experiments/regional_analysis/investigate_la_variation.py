@@ -3,18 +3,31 @@
 Investigate specific nearby points in LA with different potentials.
 """
 
-import pandas as pd
+import sys
 import numpy as np
-from scipy.spatial.distance import cdist
+from pathlib import Path
+from scipy.spatial import cKDTree
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import io
 
 print("Loading data...")
 # Load census tracts
-census_df = pd.read_csv('res/censusTracts.csv')
-census_points = np.column_stack((census_df['LONGITUDE'].values, census_df['LATITUDE'].values))
-census_pops = census_df['POPULATION'].values
+# (only the columns used below; coordinates stay float64 for the distances)
+census_df = io.load_csv('res/censusTracts.csv',
+                        usecols=['LONGITUDE', 'LATITUDE', 'POPULATION'],
+                        dtype={'LONGITUDE': np.float64, 'LATITUDE': np.float64,
+                               'POPULATION': np.int32})
+census_lons = census_df['LONGITUDE'].to_numpy()
+census_lats = census_df['LATITUDE'].to_numpy()
+census_pops = census_df['POPULATION'].to_numpy()
+census_points = np.column_stack((census_lons, census_lats))
+census_tree = cKDTree(census_points)
 
 # Load triangle centers
-triangle_data = np.loadtxt('output/usa/triangle_centers_d3_potential.csv', delimiter=',')
+triangle_data = io.load_numeric_csv('output/usa/triangle_centers_d3_potential.csv')
 triangle_centers = triangle_data[:, 0:2]
 potentials = triangle_data[:, 2]
 
@@ -34,33 +47,39 @@ print(f"Potential range: {la_potentials.min():.0f} to {la_potentials.max():.0f}"
 
 print("\nSearching for nearby points with large potential differences...")
 
-interesting_pairs = []
-
-for i in range(min(1000, len(la_centers))):  # Sample to avoid n² explosion
-    for j in range(i+1, min(i+100, len(la_centers))):
-        dist = np.linalg.norm(la_centers[i] - la_centers[j])
-
-        if dist < 0.02:  # Within ~1.4 miles
-            pot_i = la_potentials[i]
-            pot_j = la_potentials[j]
-
-            ratio = max(pot_i, pot_j) / min(pot_i, pot_j)
-
-            if ratio > 5:  # More than 5× difference
-                interesting_pairs.append({
-                    'idx_i': np.where(la_mask)[0][i],
-                    'idx_j': np.where(la_mask)[0][j],
-                    'lon_i': la_centers[i, 0],
-                    'lat_i': la_centers[i, 1],
-                    'lon_j': la_centers[j, 0],
-                    'lat_j': la_centers[j, 1],
-                    'pot_i': pot_i,
-                    'pot_j': pot_j,
-                    'dist': dist * 69,  # miles
-                    'ratio': ratio
-                })
-
-interesting_pairs.sort(key=lambda x: x['ratio'], reverse=True)
+# Every pair of LA centers within 0.02 degrees, found with a KD-tree
+# (sorted so ties in ratio keep a deterministic order)
+pairs = cKDTree(la_centers).query_pairs(0.02, output_type='ndarray')
+pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+pair_i, pair_j = pairs[:, 0], pairs[:, 1]
+
+# Squared distances for the radius test; sqrt is taken on kept pairs only
+THRESH2 = 0.02 * 0.02
+delta = la_centers[pair_i] - la_centers[pair_j]
+dists2 = np.einsum('ij,ij->i', delta, delta)
+pots_i = la_potentials[pair_i]
+pots_j = la_potentials[pair_j]
+ratios = np.maximum(pots_i, pots_j) / np.minimum(pots_i, pots_j)
+
+# Within ~1.4 miles and more than 5× difference, largest ratio first
+keep = np.flatnonzero((dists2 < THRESH2) & (ratios > 5))
+keep = keep[np.argsort(-ratios[keep], kind='stable')]
+dists = np.zeros(len(pairs))
+dists[keep] = np.sqrt(dists2[keep])
+
+la_indices = np.flatnonzero(la_mask)
+interesting_pairs = [{
+    'idx_i': la_indices[i],
+    'idx_j': la_indices[j],
+    'lon_i': la_centers[i, 0],
+    'lat_i': la_centers[i, 1],
+    'lon_j': la_centers[j, 0],
+    'lat_j': la_centers[j, 1],
+    'pot_i': pots_i[k],
+    'pot_j': pots_j[k],
+    'dist': dists[k] * 69,  # miles
+    'ratio': ratios[k]
+} for k, i, j in zip(keep, pair_i[keep], pair_j[keep])]
 
 print(f"\nFound {len(interesting_pairs)} nearby pairs with >5× potential difference")
 
@@ -69,7 +88,13 @@ if interesting_pairs:
     print("TOP 5 MOST EXTREME NEARBY PAIRS")
     print("="*70)
 
-    for k, pair in enumerate(interesting_pairs[:5]):
+    # 5 nearest census tracts to both points of every top pair, in one query
+    top_pairs = interesting_pairs[:5]
+    query_points = np.array([[(pair['lon_i'], pair['lat_i']), (pair['lon_j'], pair['lat_j'])]
+                             for pair in top_pairs])
+    nearest_dists, nearest_idxs = census_tree.query(query_points, k=5)
+
+    for k, pair in enumerate(top_pairs):
         print(f"\nPair {k+1}: {pair['ratio']:.1f}× difference, {pair['dist']:.2f} miles apart")
         print(f"  Point A: ({pair['lat_i']:.5f}°N, {pair['lon_i']:.5f}°W)")
         print(f"           Potential = {pair['pot_i']:.0f}")
@@ -78,26 +103,15 @@ if interesting_pairs:
         print(f"           Potential = {pair['pot_j']:.0f}")
         print(f"           https://www.google.com/maps/@{pair['lat_j']},{pair['lon_j']},17z")
 
-        # Find nearby census tracts
-        point_a = np.array([[pair['lon_i'], pair['lat_i']]])
-        point_b = np.array([[pair['lon_j'], pair['lat_j']]])
-
-        dist_a = cdist(point_a, census_points)[0]
-        dist_b = cdist(point_b, census_points)[0]
-
-        # Find 5 nearest tracts to each point
-        nearest_a = np.argsort(dist_a)[:5]
-        nearest_b = np.argsort(dist_b)[:5]
-
         print(f"\n  5 Nearest census tracts to Point A:")
-        for idx in nearest_a:
-            dist_miles = dist_a[idx] * 69
-            print(f"    {dist_miles:.2f} mi: pop={census_pops[idx]:,} at ({census_df.iloc[idx]['LATITUDE']:.5f}, {census_df.iloc[idx]['LONGITUDE']:.5f})")
+        for dist, idx in zip(nearest_dists[k, 0], nearest_idxs[k, 0]):
+            dist_miles = dist * 69
+            print(f"    {dist_miles:.2f} mi: pop={census_pops[idx]:,} at ({census_lats[idx]:.5f}, {census_lons[idx]:.5f})")
 
         print(f"\n  5 Nearest census tracts to Point B:")
-        for idx in nearest_b:
-            dist_miles = dist_b[idx] * 69
-            print(f"    {dist_miles:.2f} mi: pop={census_pops[idx]:,} at ({census_df.iloc[idx]['LATITUDE']:.5f}, {census_df.iloc[idx]['LONGITUDE']:.5f})")
+        for dist, idx in zip(nearest_dists[k, 1], nearest_idxs[k, 1]):
+            dist_miles = dist * 69
+            print(f"    {dist_miles:.2f} mi: pop={census_pops[idx]:,} at ({census_lats[idx]:.5f}, {census_lons[idx]:.5f})")
 else:
     print("\nNo pairs found with >5× difference within 1.4 miles")
 
@@ -4,12 +4,20 @@ Visualize high-density regions (95th percentile and above).
 Show the connected megalopolis structures without trying to trace ridgelines.
 """
 
+import sys
+from pathlib import Path
+
 import numpy as np
 import plotly.graph_objects as go
 
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import io
+
 # Load USA natural data
 print("Loading USA natural potential data...")
-data = np.loadtxt('output/usa_natural/census_tract_potential.csv', delimiter=',', skiprows=1)
+data = io.load_numeric_csv('output/usa_natural/census_tract_potential.csv', skiprows=1)
 lons = data[:, 0]
 lats = data[:, 1]
 potentials = data[:, 2]
@@ -29,14 +37,20 @@ low_mask = ~high_mask
 print(f"High-potential points: {high_mask.sum():,} ({100*high_mask.sum()/len(lons):.1f}%)")
 print(f"Low-potential points: {low_mask.sum():,} ({100*low_mask.sum()/len(lons):.1f}%)")
 
+# Plotted arrays as float32, which halves the typed-array payload in the
+# HTML; the log color for the highlighted points is computed once
+lons32 = lons.astype(np.float32)
+lats32 = lats.astype(np.float32)
+log_high = np.log10(potentials[high_mask]).astype(np.float32)
+
 # Create figure
 print("\nCreating visualization...")
 fig = go.Figure()
 
 # Add low-potential points (background)
 fig.add_trace(go.Scattergeo(
-    lon=lons[low_mask],
-    lat=lats[low_mask],
+    lon=lons32[low_mask],
+    lat=lats32[low_mask],
     mode='markers',
     marker=dict(
         size=2,
@@ -49,17 +63,17 @@ fig.add_trace(go.Scattergeo(
 
 # Add high-potential points (highlighted)
 fig.add_trace(go.Scattergeo(
-    lon=lons[high_mask],
-    lat=lats[high_mask],
+    lon=lons32[high_mask],
+    lat=lats32[high_mask],
     mode='markers',
     marker=dict(
         size=4,
-        color=np.log10(potentials[high_mask]),
+        color=log_high,
         colorscale='Viridis',
         showscale=True,
         colorbar=dict(title='Log(Potential)'),
         cmin=np.log10(threshold),
-        cmax=np.log10(potentials.max())
+        cmax=float(log_high.max())
     ),
     name='High density (>95%)',
     hovertemplate='Lon: %{lon:.3f}<br>Lat: %{lat:.3f}<br>Potential: %{marker.color:.2e}<extra></extra>'
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
 import sys
 from datetime import datetime
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io, potential
 
 def log(msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
@@ -12,29 +16,18 @@ def log(msg):
 
 # Load California data
 log('Loading California data...')
-df = pd.read_csv('output/california_potential_d3_capped.csv',
-                 names=['type', 'pop', 'lat', 'lon', 'potential'])
+df = io.load_potential_csv('output/california_potential_d3_capped.csv')
 
 log(f'Loaded {len(df)} census tract centroids')
 
-# Create triangulation and centers
+# Create triangulation (cached in output/.cache between runs) and centers
 log('Computing Delaunay triangulation...')
 census_points = np.column_stack((df['lon'].values, df['lat'].values))
-tri = Delaunay(census_points)
-log(f'Created {len(tri.simplices)} triangles')
+simplices = geometry.triangulate_cached(census_points)
+log(f'Created {len(simplices)} triangles')
 
 log('Calculating triangle centers...')
-triangle_centers = []
-for i, triangle in enumerate(tri.simplices):
-    if i % 5000 == 0:
-        log(f'  Processing triangle {i}/{len(tri.simplices)}...')
-    p0 = census_points[triangle[0]]
-    p1 = census_points[triangle[1]]
-    p2 = census_points[triangle[2]]
-    center = (p0 + p1 + p2) / 3.0
-    triangle_centers.append(center)
-
-triangle_centers = np.array(triangle_centers)
+triangle_centers = geometry.calculate_triangle_centers(census_points, simplices)
 log(f'Calculated {len(triangle_centers)} triangle centers')
 
 # Calculate potential at centers using VECTORIZED operations
@@ -46,67 +39,47 @@ tract_lons = df['lon'].values
 tract_lats = df['lat'].values
 tract_pops = df['pop'].values
 
-# Average latitude for scaling
-avg_lat = np.mean(tract_lats)
-cos_avg_lat = np.cos(np.radians(avg_lat))
-
-potentials_at_centers = np.zeros(len(triangle_centers))
-
-# Process in chunks to manage memory
-chunk_size = 1000
-num_chunks = (len(triangle_centers) + chunk_size - 1) // chunk_size
-
-for chunk_idx in range(num_chunks):
-    start_idx = chunk_idx * chunk_size
-    end_idx = min(start_idx + chunk_size, len(triangle_centers))
-
-    if chunk_idx % 5 == 0:
-        pct = 100 * start_idx / len(triangle_centers)
-        log(f'  Processing centers {start_idx}/{len(triangle_centers)} ({pct:.1f}%)')
-
-    # Get chunk of centers
-    centers_chunk = triangle_centers[start_idx:end_idx]
-
-    # Vectorized distance calculation
-    center_lons = centers_chunk[:, 0]
-    center_lats = centers_chunk[:, 1]
-
-    # Broadcast to get all pairwise distances
-    dlon = (center_lons[:, np.newaxis] - tract_lons[np.newaxis, :]) * cos_avg_lat
-    dlat = center_lats[:, np.newaxis] - tract_lats[np.newaxis, :]
-
-    # Euclidean distance in scaled (lon, lat) space
-    # Multiply by ~69 miles per degree to get approximate miles
-    distances = np.sqrt(dlon**2 + dlat**2) * 69.0
-
-    # Avoid division by zero
-    distances = np.maximum(distances, 0.001)
-
-    # Calculate contributions: pop / d^3, capped at 500k
-    contributions = tract_pops[np.newaxis, :] / (distances ** 3)
-    contributions = np.minimum(contributions, 500000)
-
-    # Sum contributions for each center in chunk
-    potentials_chunk = np.sum(contributions, axis=1)
-    potentials_at_centers[start_idx:end_idx] = potentials_chunk
+# Optional truncation: --max-distance=MILES skips tracts farther than that
+# from a center, trading the far-field tail of pop/d^3 (small, but not zero)
+# for work proportional to the tracts in range instead of all of them
+max_distance = None
+for arg in sys.argv[1:]:
+    if arg.startswith('--max-distance='):
+        max_distance = float(arg.split('=')[1])
+
+# Capped pop / d^3, in lib's fused cos-corrected kernel (planar miles about
+# the mean latitude, distances floored at 0.001 miles). float32 coordinates
+# (centred by lib) keep ~1e-4 mile resolution across the state; sums stay
+# float64.
+if max_distance is None:
+    log(f'  {len(triangle_centers)} centers x {len(tract_lons)} tracts...')
+else:
+    log(f'  {len(triangle_centers)} centers, tracts within {max_distance:g} miles only...')
+potentials_at_centers = potential.calculate_potential_chunked(
+    triangle_centers[:, 0], triangle_centers[:, 1],
+    tract_lons, tract_lats, tract_pops,
+    geometry.cos_corrected_distance, force_exponent=3,
+    min_distance_miles=0.001, max_distance_miles=max_distance,
+    max_contribution=500000.0, n_jobs=-1, dtype=np.float32
+)
+color_log = np.log10(potentials_at_centers + 1).astype(np.float32)
 
 log(f'\nPotential range: {potentials_at_centers.min():.0f} to {potentials_at_centers.max():.0f}')
 
 # Raw height, log color
 z_raw = potentials_at_centers
-color_log = np.log10(potentials_at_centers + 1)
 
 # Triangulate centers
 log('\nCreating visualization mesh...')
-tri_centers = Delaunay(triangle_centers)
+center_simplices = geometry.triangulate_cached(triangle_centers)
 
 fig = go.Figure(data=[go.Mesh3d(
     x=triangle_centers[:,0],
     y=triangle_centers[:,1],
     z=z_raw,
-    i=tri_centers.simplices[:,0],
-    j=tri_centers.simplices[:,1],
-    k=tri_centers.simplices[:,2],
+    i=center_simplices[:,0],
+    j=center_simplices[:,1],
+    k=center_simplices[:,2],
     colorscale='Viridis',
     intensity=color_log,
     colorbar=dict(title='log₁₀(Potential)<br>(color only)'),
@@ -115,10 +88,11 @@ fig = go.Figure(data=[go.Mesh3d(
 )])
 
 # Aspect ratio - scale z to match Bay Area proportions
-avg_lat = triangle_centers[:,1].mean()
-cos_avg_lat = np.cos(np.radians(avg_lat))
+# (the mid-latitude of the extent is close enough to scale longitude)
+lat_min, lat_max = triangle_centers[:,1].min(), triangle_centers[:,1].max()
+cos_avg_lat = np.cos(np.radians(0.5 * (lat_min + lat_max)))
 lon_range = triangle_centers[:,0].max() - triangle_centers[:,0].min()
-lat_range = triangle_centers[:,1].max() - triangle_centers[:,1].min()
+lat_range = lat_max - lat_min
 aspect_x = lon_range * cos_avg_lat / lat_range
 
 # Scale z_aspect proportional to region size (match Bay Area)
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
 import sys
 from datetime import datetime
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io, potential
 
 def log(msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
@@ -12,67 +16,68 @@ def log(msg):
 
 # Load USA data
 log('Loading USA data...')
-df = pd.read_csv('output/census_potential_d3_capped.csv',
-                 names=['type', 'pop', 'lat', 'lon', 'potential'])
+df = io.load_potential_csv('output/census_potential_d3_capped.csv')
 
 log(f'Loaded {len(df)} census tract centroids')
 
-# Create triangulation and centers
+# Plain numpy columns, pulled out of the DataFrame once
+lons = df['lon'].to_numpy()
+lats = df['lat'].to_numpy()
+pops = df['pop'].to_numpy()
+
+# Create triangulation (cached in output/.cache between runs) and centers
 log('Computing Delaunay triangulation...')
-census_points = np.column_stack((df['lon'].values, df['lat'].values))
-tri = Delaunay(census_points)
-log(f'Created {len(tri.simplices)} triangles')
+census_points = np.column_stack((lons, lats))
+simplices = geometry.triangulate_cached(census_points)
+log(f'Created {len(simplices)} triangles')
 
 log('Calculating triangle centers...')
-triangle_centers = []
-for i, triangle in enumerate(tri.simplices):
-    if i % 10000 == 0:
-        log(f'  Processing triangle {i}/{len(tri.simplices)}...')
-    p0 = census_points[triangle[0]]
-    p1 = census_points[triangle[1]]
-    p2 = census_points[triangle[2]]
-    center = (p0 + p1 + p2) / 3.0
-    triangle_centers.append(center)
-
-triangle_centers = np.array(triangle_centers)
+triangle_centers = geometry.calculate_triangle_centers(census_points, simplices)
 log(f'Calculated {len(triangle_centers)} triangle centers')
 
 # Calculate potential at centers
 log('\nCalculating potential at triangle centers...')
-log('(This will take several hours for USA...)')
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    dlat = np.radians(lat2 - lat1)
-    dlon = np.radians(lon2 - lon1)
-    lat1_rad = np.radians(lat1)
-    lat2_rad = np.radians(lat2)
-    a = np.sin(dlat/2)**2 + np.sin(dlon/2)**2 * np.cos(lat1_rad) * np.cos(lat2_rad)
-    c = 2 * np.arcsin(np.sqrt(a))
-    return 3960 * c
-
-potentials_at_centers = []
-for i, center in enumerate(triangle_centers):
-    if i % 1000 == 0:
-        log(f'  Center {i}/{len(triangle_centers)} ({100*i/len(triangle_centers):.1f}%)')
-
-    center_lon, center_lat = center
-    potential = 0.0
-
-    for j in range(len(df)):
-        tract_lat = df['lat'].iloc[j]
-        tract_lon = df['lon'].iloc[j]
-        tract_pop = df['pop'].iloc[j]
-
-        if tract_pop > 0:
-            d = haversine_distance(center_lat, center_lon, tract_lat, tract_lon)
-            if d > 0:
-                contribution = tract_pop / (d ** 3)
-                contribution = min(contribution, 500000)
-                potential += contribution
-
-    potentials_at_centers.append(potential)
-
-potentials_at_centers = np.array(potentials_at_centers)
+
+# Tract arrays, hoisted out of the kernel; zero-population tracts
+# contribute nothing, so they are dropped up front
+has_pop = pops > 0
+tract_pops = pops[has_pop]
+tract_lats = lats[has_pop]
+tract_lons = lons[has_pop]
+
+# Optional flat-earth distances: --planar swaps great-circle miles for lib's
+# cos-corrected planar miles about the mean latitude (one sqrt per pair, no
+# trig). East-west distances drift away from that latitude, so this suits
+# regional extracts; on the full USA potentials move by ~10% (median).
+planar = '--planar' in sys.argv[1:]
+distance_fn = geometry.cos_corrected_distance if planar else geometry.haversine_distance
+
+# Optional truncation: --max-distance=MILES skips tracts farther than that
+# from a center, trading the far-field tail of pop/d^3 (small, but not zero)
+# for work proportional to the tracts in range instead of all of them
+max_distance = None
+for arg in sys.argv[1:]:
+    if arg.startswith('--max-distance='):
+        max_distance = float(arg.split('=')[1])
+
+if max_distance is None:
+    log(f'  {len(triangle_centers)} centers x {len(tract_pops)} tracts...')
+else:
+    # lib prunes with a KD-tree: spatially compact chunks of centers, each
+    # against only the tracts within range of any of its centers
+    log(f'  {len(triangle_centers)} centers, tracts within {max_distance:g} miles only...')
+
+# Capped pop / d^3 in lib's fused kernels, run in float32 (half the memory
+# traffic, twice the SIMD lanes) and summed per center in float64. Centers
+# never sit exactly on a tract, so the 0.001-mile floor only guards against
+# a degenerate triangle; the cap applies long before it.
+potentials_at_centers = potential.calculate_potential_chunked(
+    triangle_centers[:, 0], triangle_centers[:, 1],
+    tract_lons, tract_lats, tract_pops, distance_fn,
+    force_exponent=3, min_distance_miles=0.001, max_distance_miles=max_distance,
+    max_contribution=500000.0, n_jobs=-1, dtype=np.float32
+)
+
 log(f'\nPotential range: {potentials_at_centers.min():.0f} to {potentials_at_centers.max():.0f}')
 
 # Raw height, log color
@@ -81,15 +86,15 @@ color_log = np.log10(potentials_at_centers + 1)
 
 # Triangulate centers
 log('\nCreating visualization mesh...')
-tri_centers = Delaunay(triangle_centers)
+center_simplices = geometry.triangulate_cached(triangle_centers)
 
 fig = go.Figure(data=[go.Mesh3d(
     x=triangle_centers[:,0],
     y=triangle_centers[:,1],
     z=z_raw,
-    i=tri_centers.simplices[:,0],
-    j=tri_centers.simplices[:,1],
-    k=tri_centers.simplices[:,2],
+    i=center_simplices[:,0],
+    j=center_simplices[:,1],
+    k=center_simplices[:,2],
     colorscale='Viridis',
     intensity=color_log,
     colorbar=dict(title='log₁₀(Potential)<br>(color only)'),
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
 import sys
 from datetime import datetime
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io, potential
 
 def log(msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
@@ -12,29 +16,18 @@ def log(msg):
 
 # Load USA data
 log('Loading USA data...')
-df = pd.read_csv('output/census_potential_d3_capped.csv',
-                 names=['type', 'pop', 'lat', 'lon', 'potential'])
+df = io.load_potential_csv('output/census_potential_d3_capped.csv')
 
 log(f'Loaded {len(df)} census tract centroids')
 
-# Create triangulation and centers
+# Create triangulation (cached in output/.cache between runs) and centers
 log('Computing Delaunay triangulation...')
 census_points = np.column_stack((df['lon'].values, df['lat'].values))
-tri = Delaunay(census_points)
-log(f'Created {len(tri.simplices)} triangles')
+simplices = geometry.triangulate_cached(census_points)
+log(f'Created {len(simplices)} triangles')
 
 log('Calculating triangle centers...')
-triangle_centers = []
-for i, triangle in enumerate(tri.simplices):
-    if i % 10000 == 0:
-        log(f'  Processing triangle {i}/{len(tri.simplices)}...')
-    p0 = census_points[triangle[0]]
-    p1 = census_points[triangle[1]]
-    p2 = census_points[triangle[2]]
-    center = (p0 + p1 + p2) / 3.0
-    triangle_centers.append(center)
-
-triangle_centers = np.array(triangle_centers)
+triangle_centers = geometry.calculate_triangle_centers(census_points, simplices)
 log(f'Calculated {len(triangle_centers)} triangle centers')
 
 # Calculate potential at centers using VECTORIZED operations
@@ -46,72 +39,33 @@ tract_lons = df['lon'].values
 tract_lats = df['lat'].values
 tract_pops = df['pop'].values
 
-# Average latitude for scaling
-avg_lat = np.mean(tract_lats)
-cos_avg_lat = np.cos(np.radians(avg_lat))
-
-potentials_at_centers = np.zeros(len(triangle_centers))
-
-# Process in chunks to manage memory
-chunk_size = 1000
-num_chunks = (len(triangle_centers) + chunk_size - 1) // chunk_size
-
-for chunk_idx in range(num_chunks):
-    start_idx = chunk_idx * chunk_size
-    end_idx = min(start_idx + chunk_size, len(triangle_centers))
-
-    if chunk_idx % 10 == 0:
-        pct = 100 * start_idx / len(triangle_centers)
-        log(f'  Processing centers {start_idx}/{len(triangle_centers)} ({pct:.1f}%)')
-
-    # Get chunk of centers
-    centers_chunk = triangle_centers[start_idx:end_idx]
-
-    # Vectorized distance calculation
-    # centers_chunk has shape (chunk_size, 2) with columns [lon, lat]
-    # tract arrays have shape (num_tracts,)
-    # We want distances of shape (chunk_size, num_tracts)
-
-    center_lons = centers_chunk[:, 0]  # shape (chunk_size,)
-    center_lats = centers_chunk[:, 1]  # shape (chunk_size,)
-
-    # Broadcast to get all pairwise distances
-    # Add new axis to make (chunk_size, 1) and (1, num_tracts) for broadcasting
-    dlon = (center_lons[:, np.newaxis] - tract_lons[np.newaxis, :]) * cos_avg_lat
-    dlat = center_lats[:, np.newaxis] - tract_lats[np.newaxis, :]
-
-    # Euclidean distance in scaled (lon, lat) space
-    # Multiply by ~69 miles per degree to get approximate miles
-    distances = np.sqrt(dlon**2 + dlat**2) * 69.0
-
-    # Avoid division by zero
-    distances = np.maximum(distances, 0.001)
-
-    # Calculate contributions: pop / d^3, capped at 500k
-    contributions = tract_pops[np.newaxis, :] / (distances ** 3)
-    contributions = np.minimum(contributions, 500000)
-
-    # Sum contributions for each center in chunk
-    potentials_chunk = np.sum(contributions, axis=1)
-    potentials_at_centers[start_idx:end_idx] = potentials_chunk
+# Capped pop / d^3 from every tract, in lib's fused cos-corrected kernel
+# (planar miles about the mean latitude, distances floored at 0.001 miles)
+log(f'  {len(triangle_centers)} centers x {len(tract_lons)} tracts...')
+potentials_at_centers = potential.calculate_potential_chunked(
+    triangle_centers[:, 0], triangle_centers[:, 1],
+    tract_lons, tract_lats, tract_pops,
+    geometry.cos_corrected_distance, force_exponent=3,
+    min_distance_miles=0.001, max_contribution=500000.0, n_jobs=-1
+)
+color_log = np.log10(potentials_at_centers + 1).astype(np.float32)
 
 log(f'\nPotential range: {potentials_at_centers.min():.0f} to {potentials_at_centers.max():.0f}')
 
 # Raw height, log color
 z_raw = potentials_at_centers
-color_log = np.log10(potentials_at_centers + 1)
 
 # Triangulate centers
 log('\nCreating visualization mesh...')
-tri_centers = Delaunay(triangle_centers)
+center_simplices = geometry.triangulate_cached(triangle_centers)
 
 fig = go.Figure(data=[go.Mesh3d(
     x=triangle_centers[:,0],
     y=triangle_centers[:,1],
     z=z_raw,
-    i=tri_centers.simplices[:,0],
-    j=tri_centers.simplices[:,1],
-    k=tri_centers.simplices[:,2],
+    i=center_simplices[:,0],
+    j=center_simplices[:,1],
+    k=center_simplices[:,2],
     colorscale='Viridis',
     intensity=color_log,
     colorbar=dict(title='log₁₀(Potential)<br>(color only)'),
@@ -5,8 +5,14 @@ Diagnose triangle mesh quality and potential calculation issues.
 
 import pandas as pd
 import numpy as np
-from scipy.spatial import Delaunay
-from scipy.spatial.distance import cdist
+from pathlib import Path
+import sys
+from scipy.spatial import cKDTree
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry
 
 print("="*70)
 print("TRIANGLE MESH DIAGNOSTIC")
@@ -27,38 +33,27 @@ print(f"Loaded {len(triangle_centers):,} triangle centers")
 
 # Triangulate census points to analyze geometry
 print("\nTriangulating census points...")
-tri = Delaunay(census_points)
-print(f"Created {len(tri.simplices):,} triangles")
+simplices = geometry.triangulate_cached(census_points)
+print(f"Created {len(simplices):,} triangles")
 
 # Analyze triangle geometry
 print("\n" + "="*70)
 print("TRIANGLE GEOMETRY ANALYSIS")
 print("="*70)
 
-areas = []
-aspect_ratios = []
-
-for i, triangle_idx in enumerate(tri.simplices[:10000]):  # Sample first 10k
-    p0 = census_points[triangle_idx[0]]
-    p1 = census_points[triangle_idx[1]]
-    p2 = census_points[triangle_idx[2]]
+# Vertex coordinates of the sampled triangles, (T, 3, 2)
+tri_points = census_points[simplices[:10000]]  # Sample first 10k
 
-    # Calculate area using cross product
-    v1 = p1 - p0
-    v2 = p2 - p0
-    area = 0.5 * abs(np.cross(v1, v2))
-    areas.append(area)
+# Area from the 2-D cross product
+v1 = tri_points[:, 1] - tri_points[:, 0]
+v2 = tri_points[:, 2] - tri_points[:, 0]
+areas = 0.5 * np.abs(v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0])
 
-    # Calculate aspect ratio (longest edge / shortest edge)
-    edge1 = np.linalg.norm(p1 - p0)
-    edge2 = np.linalg.norm(p2 - p1)
-    edge3 = np.linalg.norm(p0 - p2)
-    edges = [edge1, edge2, edge3]
-    aspect = max(edges) / min(edges)
-    aspect_ratios.append(aspect)
-
-areas = np.array(areas)
-aspect_ratios = np.array(aspect_ratios)
+# Aspect ratio (longest edge / shortest edge)
+edges = np.stack([np.linalg.norm(tri_points[:, 1] - tri_points[:, 0], axis=1),
+                  np.linalg.norm(tri_points[:, 2] - tri_points[:, 1], axis=1),
+                  np.linalg.norm(tri_points[:, 0] - tri_points[:, 2], axis=1)], axis=1)
+aspect_ratios = edges.max(axis=1) / edges.min(axis=1)
 
 print(f"\nTriangle areas (degrees²):")
 print(f"  Min:    {areas.min():.6f}")
@@ -83,28 +78,9 @@ print("TRIANGLE CENTER TO CENSUS TRACT DISTANCES")
 print("="*70)
 
 print("\nCalculating nearest census tract for each triangle center...")
-print("(This may take a minute...)")
-
-# Calculate distances from each triangle center to all census points
-# Do in chunks to avoid memory issues
-chunk_size = 1000
-min_distances = []
-
-for i in range(0, len(triangle_centers), chunk_size):
-    end = min(i + chunk_size, len(triangle_centers))
-    chunk = triangle_centers[i:end]
-
-    # Calculate distances to all census points
-    distances = cdist(chunk, census_points)
-
-    # Find minimum distance for each triangle center
-    chunk_min_dist = distances.min(axis=1)
-    min_distances.extend(chunk_min_dist)
-
-    if i % 10000 == 0:
-        print(f"  Processed {i:,}/{len(triangle_centers):,} centers...")
-
-min_distances = np.array(min_distances)
+# Nearest census point for every center in one KD-tree query (Euclidean in
+# degrees, as before), with no (centers x tracts) distance matrix
+min_distances, _ = cKDTree(census_points).query(triangle_centers, k=1, workers=-1)
 
 # Convert to miles (rough approximation: 1 degree ≈ 69 miles at US latitudes)
 min_distances_miles = min_distances * 69
@@ -6,46 +6,35 @@ Use N-hop topological exclusion - no arbitrary distance parameters.
 
 import pandas as pd
 import numpy as np
-from scipy.spatial import Delaunay
 from pathlib import Path
 import sys
 from datetime import datetime
-from collections import deque
-
-def get_n_hop_neighbors(tri, n_hops):
-    """Build adjacency graph and find N-hop neighbors for each vertex."""
-    n_points = tri.points.shape[0]
-
-    # Build adjacency list from triangulation
-    adjacency = [set() for _ in range(n_points)]
-    for simplex in tri.simplices:
-        for i in range(3):
-            for j in range(3):
-                if i != j:
-                    adjacency[simplex[i]].add(simplex[j])
-
-    # BFS to find N-hop neighbors for each point
-    excluded_neighbors = []
-    for vertex in range(n_points):
-        if vertex % 1000 == 0:
-            print(f"  Building exclusion sets: {vertex:,} / {n_points:,}")
-
-        excluded = {vertex}  # Always exclude self (0-hop)
-        visited = {vertex}
-        queue = deque([(vertex, 0)])
-
-        while queue:
-            current, hops = queue.popleft()
-            if hops < n_hops:
-                for neighbor in adjacency[current]:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        excluded.add(neighbor)
-                        queue.append((neighbor, hops + 1))
-
-        excluded_neighbors.append(excluded)
-
-    return excluded_neighbors
+from scipy.sparse import csr_matrix, identity
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry
+
+def get_n_hop_neighbors(simplices, n_points, n_hops):
+    """Find the vertices within N graph hops of each vertex (self included)."""
+    # Vertex adjacency from the triangle edges, both directions; edges shared
+    # by two triangles are summed, which is harmless as only the pattern is used
+    rows = np.concatenate([simplices[:, 0], simplices[:, 1], simplices[:, 2]])
+    cols = np.concatenate([simplices[:, 1], simplices[:, 2], simplices[:, 0]])
+    adjacency = csr_matrix((np.ones(2 * len(rows), dtype=np.int32),
+                            (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+                           shape=(n_points, n_points))
+
+    # Nonzero pattern of (I + A)^n_hops: every vertex reachable in <= n_hops
+    reach = identity(n_points, dtype=np.int32, format='csr')
+    for hop in range(n_hops):
+        print(f"  Expanding exclusion sets: hop {hop + 1} / {n_hops}")
+        reach = reach + reach @ adjacency
+        reach.data[:] = 1  # only the pattern matters; keep counts from growing
+
+    reach.sort_indices()
+    return [reach.indices[reach.indptr[k]:reach.indptr[k + 1]] for k in range(n_points)]
 
 def main():
     if len(sys.argv) < 3:
@@ -69,15 +58,15 @@ def main():
     print(f"Loaded {len(lons):,} census tract points")
     print(f"Total population: {pops.sum():,}")
 
-    # Delaunay triangulation - defines mesh topology
+    # Delaunay triangulation - defines mesh topology (cached between runs)
     print("\nBuilding Delaunay triangulation...")
     points = np.column_stack((lons, lats))
-    tri = Delaunay(points)
-    print(f"Created {len(tri.simplices):,} triangles")
+    simplices = geometry.triangulate_cached(points)
+    print(f"Created {len(simplices):,} triangles")
 
     # Build N-hop exclusion sets
     print(f"\nBuilding {n_hops}-hop exclusion sets...")
-    excluded_neighbors = get_n_hop_neighbors(tri, n_hops)
+    excluded_neighbors = get_n_hop_neighbors(simplices, len(points), n_hops)
     avg_excluded = np.mean([len(e) for e in excluded_neighbors])
     print(f"Average excluded neighbors: {avg_excluded:.1f} (including self)")
 
@@ -86,29 +75,46 @@ def main():
     print(f"Started at {datetime.now().strftime('%H:%M:%S')}")
 
     avg_lat = np.mean(lats)
-    cos_avg_lat = np.cos(np.radians(avg_lat))
+    cos_avg_lat = np.float32(np.cos(np.radians(avg_lat)))
 
-    potentials = np.zeros(len(lons))
-
-    # Vectorized calculation with topological masking
-    for i in range(len(lons)):
-        if i % 500 == 0:
-            progress = i / len(lons) * 100
-            print(f"  Progress: {i:,} / {len(lons):,} ({progress:.1f}%)")
+    # The distance kernel runs in float32 (half the memory traffic, twice the
+    # SIMD lanes); coordinates are centred first so they keep precision, and
+    # each row is summed in float64
+    lons32 = (lons - lons.mean()).astype(np.float32)
+    lats32 = (lats - avg_lat).astype(np.float32)
+    pops32 = pops.astype(np.float32)
 
-        # Distance from this point to all census tracts
-        dlon = (lons[i] - lons) * cos_avg_lat
-        dlat = lats[i] - lats
-        distances = np.sqrt(dlon**2 + dlat**2) * 69.0  # miles
-
-        # Create mask: exclude N-hop neighbors (topological, not geometric)
-        valid_mask = np.ones(len(lons), dtype=bool)
-        for excluded_idx in excluded_neighbors[i]:
-            valid_mask[excluded_idx] = False
+    potentials = np.zeros(len(lons))
 
-        # Calculate contributions from non-excluded points
-        contributions = np.where(valid_mask, pops / (distances ** 3), 0.0)
-        potentials[i] = np.sum(contributions)
+    # Points are processed a block at a time against every tract. Blocks are
+    # sized so each float32 (block, tracts) matrix is ~1 MB and stays in
+    # cache; past ~4K tracts the 64-row floor wins instead, trading cache
+    # residency for fewer NumPy calls per row (a 1-row block at 85K tracts
+    # would be dominated by call overhead). So blocking helps small extracts;
+    # on the full USA it only amortises that overhead.
+    chunk_size = max(64, (1 << 20) // (4 * len(lons)))
+    log_every = max(1, 500 // chunk_size)
+
+    for n, start in enumerate(range(0, len(lons), chunk_size)):
+        if n % log_every == 0:
+            progress = start / len(lons) * 100
+            print(f"  Progress: {start:,} / {len(lons):,} ({progress:.1f}%)")
+        end = min(start + chunk_size, len(lons))
+
+        # Distance from these points to all census tracts
+        dlon = (lons32[start:end, None] - lons32) * cos_avg_lat
+        dlat = lats32[start:end, None] - lats32
+        distances = np.sqrt(dlon**2 + dlat**2) * np.float32(69.0)  # miles
+
+        # Contributions, with each point's N-hop neighbors (topological,
+        # not geometric) zeroed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contributions = pops32 / (distances ** 3)
+        excluded = excluded_neighbors[start:end]
+        rows = np.repeat(np.arange(end - start), [len(e) for e in excluded])
+        contributions[rows, np.concatenate(excluded)] = 0.0
+
+        potentials[start:end] = contributions.sum(axis=1, dtype=np.float64)
 
     print(f"Finished at {datetime.now().strftime('%H:%M:%S')}")
     print(f"Potential range: {potentials.min():.2e} to {potentials.max():.2e}")
@@ -131,7 +137,7 @@ def main():
     tri_file = output_dir / 'triangulation.csv'
     np.savetxt(
         tri_file,
-        tri.simplices,
+        simplices,
         delimiter=',',
         fmt='%d',
         header='i,j,k',
@@ -144,7 +150,7 @@ def main():
         'method': 'natural_delaunay_topological_exclusion',
         'census_tracts': len(lons),
         'sample_points': len(lons),
-        'triangles': len(tri.simplices),
+        'triangles': len(simplices),
         'n_hops_excluded': n_hops,
         'avg_neighbors_excluded': avg_excluded,
         'potential_law': '1/d^3',
@@ -6,10 +6,14 @@ No artificial grid infill - completely adaptive to census tract density.
 
 import pandas as pd
 import numpy as np
-from scipy.spatial import Delaunay
 from pathlib import Path
 import sys
 
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python3 triangulate_natural.py <input_csv> <output_dir>")
@@ -30,18 +34,12 @@ def main():
 
     # Delaunay triangulation of ONLY census tracts
     print("\nBuilding Delaunay triangulation of census tracts...")
-    tri = Delaunay(census_points)
-    print(f"Created {len(tri.simplices):,} triangles")
+    simplices = geometry.triangulate_cached(census_points)
+    print(f"Created {len(simplices):,} triangles")
 
     # Calculate triangle centers - these are our sample points
     print("\nCalculating triangle centers...")
-    triangle_centers = []
-    for simplex in tri.simplices:
-        vertices = census_points[simplex]
-        center = vertices.mean(axis=0)
-        triangle_centers.append(center)
-
-    triangle_centers = np.array(triangle_centers)
+    triangle_centers = geometry.calculate_triangle_centers(census_points, simplices)
     print(f"Sample points (triangle centers): {len(triangle_centers):,}")
     print(f"Sampling density: {len(triangle_centers) / len(census_points):.2f}x census tracts")
 
@@ -63,7 +61,7 @@ def main():
         'census_tracts': len(census_points),
         'sample_points': len(triangle_centers),
         'sampling_ratio': len(triangle_centers) / len(census_points),
-        'triangles': len(tri.simplices),
+        'triangles': len(simplices),
         'description': 'Delaunay triangulation of census tracts only, no grid infill'
     }
 
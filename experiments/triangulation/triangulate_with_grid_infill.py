@@ -14,10 +14,15 @@ Strategy:
 
 import numpy as np
 import pandas as pd
-from scipy.spatial import Delaunay
 from pathlib import Path
+from scipy.spatial import cKDTree
 import sys
 
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry
+
 def generate_hex_grid(lon_min, lon_max, lat_min, lat_max, spacing_miles=2.0, avg_lat=None):
     """
     Generate hexagonal grid of points.
@@ -38,14 +43,19 @@ def generate_hex_grid(lon_min, lon_max, lat_min, lat_max, spacing_miles=2.0, avg
     lats = np.arange(lat_min, lat_max, spacing_deg_lat)
     lons = np.arange(lon_min, lon_max, spacing_deg_lon)
 
-    grid_points = []
-    for i, lat in enumerate(lats):
-        # Offset every other row by half spacing (hexagonal packing)
-        lon_offset = spacing_deg_lon / 2 if i % 2 == 1 else 0
-        for lon in lons:
-            grid_points.append([lon + lon_offset, lat])
+    grid_lons, grid_lats = np.meshgrid(lons, lats)
+
+    # Offset every other row by half spacing (hexagonal packing)
+    odd_row = (np.arange(len(lats)) % 2 == 1)[:, None]
+    grid_lons = grid_lons + np.where(odd_row, spacing_deg_lon / 2, 0.0)
+
+    return np.column_stack((grid_lons.ravel(), grid_lats.ravel()))
 
-    return np.array(grid_points)
+def nearest_distance_miles(points, census_points, cos_lat):
+    """Distance in miles from each point to its nearest census point (cos-corrected planar)."""
+    scale = np.array([cos_lat * 69.0, 69.0])
+    distances, _ = cKDTree(census_points * scale).query(points * scale, k=1)
+    return distances
 
 def filter_grid_by_distance(grid_points, census_points, min_distance_miles=2.0, avg_lat=None):
     """
@@ -58,25 +68,14 @@ def filter_grid_by_distance(grid_points, census_points, min_distance_miles=2.0,
 
     cos_lat = np.cos(np.radians(avg_lat))
 
-    kept_points = []
-
     print(f"Filtering {len(grid_points):,} grid points...")
 
-    for grid_pt in grid_points:
-        # Calculate distance to all census points
-        dlon = (grid_pt[0] - census_points[:, 0]) * cos_lat
-        dlat = grid_pt[1] - census_points[:, 1]
-        distances = np.sqrt(dlon**2 + dlat**2) * 69.0  # Convert to miles
-
-        min_dist = distances.min()
-
-        # Keep if >2 miles from any census point
-        if min_dist > min_distance_miles:
-            kept_points.append(grid_pt)
+    # Keep if >2 miles from any census point
+    kept_points = grid_points[nearest_distance_miles(grid_points, census_points, cos_lat) > min_distance_miles]
 
     print(f"Kept {len(kept_points):,} grid points (filtered out {len(grid_points) - len(kept_points):,})")
 
-    return np.array(kept_points) if kept_points else np.empty((0, 2))
+    return kept_points
 
 def main():
     if len(sys.argv) < 3:
@@ -138,17 +137,12 @@ def main():
 
     # Triangulate
     print("\nTriangulating...")
-    tri = Delaunay(combined_points)
-    print(f"Created {len(tri.simplices):,} triangles")
+    simplices = geometry.triangulate_cached(combined_points)
+    print(f"Created {len(simplices):,} triangles")
 
     # Calculate triangle centers
     print("Calculating triangle centers...")
-    triangle_centers = []
-    for simplex in tri.simplices:
-        p0, p1, p2 = combined_points[simplex]
-        center = (p0 + p1 + p2) / 3.0
-        triangle_centers.append(center)
-    triangle_centers = np.array(triangle_centers)
+    triangle_centers = geometry.calculate_triangle_centers(combined_points, simplices)
 
     print(f"Calculated {len(triangle_centers):,} triangle centers")
 
@@ -158,18 +152,10 @@ def main():
     max_distance_miles = 50.0  # Discard if >50 miles from any tract
     cos_lat = np.cos(np.radians(avg_lat))
 
-    kept_centers = []
-    for center in triangle_centers:
-        dlon = (center[0] - census_points[:, 0]) * cos_lat
-        dlat = center[1] - census_points[:, 1]
-        distances = np.sqrt(dlon**2 + dlat**2) * 69.0
-        min_dist = distances.min()
-
-        if min_dist <= max_distance_miles:
-            kept_centers.append(center)
+    keep = nearest_distance_miles(triangle_centers, census_points, cos_lat) <= max_distance_miles
 
     original_count = len(triangle_centers)
-    triangle_centers = np.array(kept_centers)
+    triangle_centers = triangle_centers[keep]
     filtered_count = original_count - len(triangle_centers)
     print(f"Kept {len(triangle_centers):,} triangle centers (filtered {filtered_count:,} remote points)")
     print(f"Max distance threshold: {max_distance_miles} miles")
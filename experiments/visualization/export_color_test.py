@@ -6,12 +6,17 @@ Test case: linear Z height + log color intensity
 
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
 import sys
+from pathlib import Path
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io
 
 def load_potential_data(csv_path):
     """Load triangle centers + potential from CSV."""
-    data = np.loadtxt(csv_path, delimiter=',')
+    data = io.load_numeric_csv(csv_path)
     lons = data[:, 0]
     lats = data[:, 1]
     potentials = data[:, 2]
@@ -31,9 +36,9 @@ def main():
     lons, lats, potentials = load_potential_data(csv_path)
     print(f"Loaded {len(lons):,} sample points")
 
-    # Build triangulation
+    # Build triangulation (cached in output/.cache between runs)
     print("Building Delaunay triangulation...")
-    tri = Delaunay(np.column_stack((lons, lats)))
+    simplices = geometry.triangulate_cached(np.column_stack((lons, lats)))
 
     # Z scaling: LINEAR (dramatic peaks)
     print("Applying linear Z scaling...")
@@ -56,9 +61,9 @@ def main():
         x=lons,
         y=lats,
         z=z_scaled,
-        i=tri.simplices[:, 0],
-        j=tri.simplices[:, 1],
-        k=tri.simplices[:, 2],
+        i=simplices[:, 0],
+        j=simplices[:, 1],
+        k=simplices[:, 2],
         intensity=color_normalized,
         colorscale='Viridis',
         showscale=True,
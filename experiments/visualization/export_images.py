@@ -3,25 +3,32 @@
 Generate PNG images from potential data with multiple camera angles and render styles.
 """
 
+import os
 import numpy as np
 import plotly.graph_objects as go
-from scipy.spatial import Delaunay
-from scipy.interpolate import griddata
+import plotly.io as pio
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from scipy.interpolate import LinearNDInterpolator
 from pathlib import Path
 import sys
+import tempfile
+
+# Add project root to path so we can import lib
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib import geometry, io
 
 def load_potential_data(csv_path):
     """Load triangle centers + potential from CSV."""
-    data = np.loadtxt(csv_path, delimiter=',')
+    data = io.load_numeric_csv(csv_path)
     lons = data[:, 0]
     lats = data[:, 1]
     potentials = data[:, 2]
     return lons, lats, potentials
 
-def create_mesh_figure(lons, lats, potentials, title, camera, lighting, z_transform=None, color_transform=None, colorscale='Greys'):
-    """Create a Mesh3d figure."""
-    tri = Delaunay(np.column_stack((lons, lats)))
-
+def mesh_values(lons, potentials, z_transform=None, color_transform=None):
+    """Scaled heights and normalized colors (float32, for Plotly) for the Mesh3d render."""
     # Apply Z transformation (for height)
     p_shifted = potentials - potentials.min()
     if z_transform is not None:
@@ -29,10 +36,10 @@ def create_mesh_figure(lons, lats, potentials, title, camera, lighting, z_transf
     else:
         p_transformed = p_shifted
 
-    # Scale Z to 8% of longitude range
+    # Scale Z to 8% of longitude range (in place on the normalized copy)
     lon_range = lons.max() - lons.min()
-    z_normalized = p_transformed / p_transformed.max()
-    z_scaled = z_normalized * (lon_range * 0.08)
+    z_scaled = p_transformed / p_transformed.max()
+    z_scaled *= lon_range * 0.08
 
     # Apply color transformation (for intensity/color mapping)
     if color_transform is not None:
@@ -43,13 +50,44 @@ def create_mesh_figure(lons, lats, potentials, title, camera, lighting, z_transf
     # Normalize color values for colorscale
     color_normalized = color_values / color_values.max()
 
+    return z_scaled.astype(np.float32), color_normalized.astype(np.float32)
+
+def surface_grid(tri, lons, lats, potentials, z_transform=None, grid_res=(300, 200)):
+    """Interpolate onto a regular grid (reusing tri) and scale heights (float32) for the Surface render."""
+    # Interpolate to regular grid
+    grid_lon = np.linspace(lons.min(), lons.max(), grid_res[0])
+    grid_lat = np.linspace(lats.min(), lats.max(), grid_res[1])
+    lon_mesh, lat_mesh = np.meshgrid(grid_lon, grid_lat)
+
+    # Same as griddata(method='linear'), without triangulating again; points
+    # outside the hull get the minimum potential
+    p_min = potentials.min()
+    interp = LinearNDInterpolator(tri, potentials, fill_value=p_min)
+    pot_mesh = interp(lon_mesh, lat_mesh)
+
+    # Apply Z transformation
+    p_shifted = np.subtract(pot_mesh, p_min, out=pot_mesh)
+    if z_transform is not None:
+        p_transformed = z_transform(p_shifted)
+    else:
+        p_transformed = p_shifted
+
+    # Scale Z to 8% of longitude range (in place on the normalized copy)
+    lon_range = lons.max() - lons.min()
+    z_mesh = p_transformed / p_transformed.max()
+    z_mesh *= lon_range * 0.08
+
+    return lon_mesh.astype(np.float32), lat_mesh.astype(np.float32), z_mesh.astype(np.float32)
+
+def create_mesh_figure(lons, lats, simplices, z_scaled, color_normalized, title, camera, lighting, colorscale='Greys'):
+    """Create a Mesh3d figure from a precomputed triangulation and mesh_values()."""
     fig = go.Figure(data=[go.Mesh3d(
         x=lons,
         y=lats,
         z=z_scaled,
-        i=tri.simplices[:, 0],
-        j=tri.simplices[:, 1],
-        k=tri.simplices[:, 2],
+        i=simplices[:, 0],
+        j=simplices[:, 1],
+        k=simplices[:, 2],
         intensity=color_normalized,
         colorscale=colorscale,
         showscale=False,
@@ -77,33 +115,8 @@ def create_mesh_figure(lons, lats, potentials, title, camera, lighting, z_transf
 
     return fig
 
-def create_surface_figure(lons, lats, potentials, title, camera, lighting, z_transform=None, grid_res=(300, 200)):
-    """Create a Surface figure."""
-    # Interpolate to regular grid
-    grid_lon = np.linspace(lons.min(), lons.max(), grid_res[0])
-    grid_lat = np.linspace(lats.min(), lats.max(), grid_res[1])
-    lon_mesh, lat_mesh = np.meshgrid(grid_lon, grid_lat)
-
-    pot_mesh = griddata(
-        np.column_stack((lons, lats)),
-        potentials,
-        (lon_mesh, lat_mesh),
-        method='linear'
-    )
-    pot_mesh = np.nan_to_num(pot_mesh, nan=potentials.min())
-
-    # Apply Z transformation
-    p_shifted = pot_mesh - potentials.min()
-    if z_transform is not None:
-        p_transformed = z_transform(p_shifted)
-    else:
-        p_transformed = p_shifted
-
-    # Scale Z to 8% of longitude range
-    lon_range = lons.max() - lons.min()
-    z_normalized = p_transformed / p_transformed.max()
-    z_mesh = z_normalized * (lon_range * 0.08)
-
+def create_surface_figure(lon_mesh, lat_mesh, z_mesh, title, camera, lighting):
+    """Create a Surface figure from a surface_grid() grid."""
     fig = go.Figure(data=[go.Surface(
         x=lon_mesh,
         y=lat_mesh,
@@ -133,6 +146,39 @@ def create_surface_figure(lons, lats, potentials, title, camera, lighting, z_tra
 
     return fig
 
+def render_batch(tasks, arrays_path):
+    """
+    Write the PNGs for a list of (render_type, title, camera, lighting, output_path) tasks.
+
+    Each render type's figure is built and converted to a dict once, which
+    encodes its arrays as base64 typed arrays (plotly >= 5.19); tasks only
+    swap title, camera and lighting on shallow copies, so the geometry is
+    never re-encoded. The whole batch goes to a single plotly.io.write_images
+    call, so one Kaleido browser session renders every image.
+    """
+    arrays = np.load(arrays_path)
+    base_figs = {}
+    figs = []
+    for render_type, title, camera, lighting, _ in tasks:
+        if render_type not in base_figs:
+            if render_type == 'mesh':
+                fig = create_mesh_figure(
+                    arrays['lons'], arrays['lats'], arrays['simplices'],
+                    arrays['z_scaled'], arrays['color_normalized'], title, camera, lighting)
+            else:
+                fig = create_surface_figure(
+                    arrays['lon_mesh'], arrays['lat_mesh'], arrays['z_mesh'], title, camera, lighting)
+            base_figs[render_type] = fig.to_dict()
+
+        base = base_figs[render_type]
+        layout = dict(base['layout'], title=dict(base['layout']['title'], text=title),
+                      scene=dict(base['layout']['scene'], camera=camera))
+        figs.append(dict(base, data=[dict(base['data'][0], lighting=lighting)], layout=layout))
+
+    output_paths = [task[-1] for task in tasks]
+    pio.write_images(figs, output_paths, validate=False)
+    return output_paths
+
 def main():
     # Parse arguments
     quick_mode = True  # Default to quick mode
@@ -223,25 +269,43 @@ def main():
     output_dir = Path(f'output/{region}/renders')
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Generate images
+    # Everything but camera and lighting is the same for every image, so
+    # triangulate once (shared by the mesh and the surface interpolation)
+    print("Triangulating and interpolating...")
+    tri = geometry.triangulate(np.column_stack((lons, lats)))
+    z_scaled, color_normalized = mesh_values(lons, potentials, z_transform)
+    lon_mesh, lat_mesh, z_mesh = surface_grid(tri, lons, lats, potentials, z_transform)
+
+    # Generate images in parallel batches, one Kaleido session per worker.
+    # Workers load the shared arrays from one .npz instead of having them
+    # pickled into every task.
     render_types = ['mesh', 'surface']
 
+    tasks = []
     for render_type in render_types:
         for cam_name, camera in cameras.items():
             for light_name, lighting in lightings.items():
                 title = f"{region.title().replace('_', ' ')} - {render_type.title()} - {cam_name}/{light_name} - {z_scaling}"
                 filename = f"{region}_d3_2mile_{render_type}_{cam_name}_{light_name}_{z_scaling}.png"
-                output_path = output_dir / filename
-
-                print(f"Generating {filename}...")
-
-                if render_type == 'mesh':
-                    fig = create_mesh_figure(lons, lats, potentials, title, camera, lighting, z_transform)
-                else:
-                    fig = create_surface_figure(lons, lats, potentials, title, camera, lighting, z_transform)
-
-                fig.write_image(str(output_path))
-                print(f"  Saved to {output_path}")
+                tasks.append((render_type, title, camera, lighting, str(output_dir / filename)))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Plotly ships arrays to Kaleido as typed buffers, so float32 halves
+        # the payload of every render; the math above stays in float64
+        arrays_path = Path(tmp_dir) / 'render_arrays.npz'
+        np.savez(arrays_path,
+                 lons=lons.astype(np.float32), lats=lats.astype(np.float32),
+                 simplices=tri.simplices, z_scaled=z_scaled, color_normalized=color_normalized,
+                 lon_mesh=lon_mesh, lat_mesh=lat_mesh, z_mesh=z_mesh)
+
+        workers = min(len(tasks), os.cpu_count())
+        batches = [tasks[w::workers] for w in range(workers)]
+
+        print(f"Rendering {len(tasks)} images in {workers} batches...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for output_paths in executor.map(render_batch, batches, repeat(arrays_path)):
+                for output_path in output_paths:
+                    print(f"  Saved to {output_path}")
 
     print(f"\nDone! Generated {len(cameras) * len(lightings) * len(render_types)} images")
     print(f"Open with: open {output_dir}")
@@ -0,0 +1,221 @@
+"""CUDA kernels for potential calculation (requires numba with CUDA support).
+
+Imported lazily by potential.calculate_potential_chunked(use_gpu=True), so
+numba.cuda is only loaded when a GPU run is requested.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+from numba import cuda, float32, float64
+
+from .constants import EARTH_RADIUS_MILES
+
+# Threads per block; also the number of sources staged in shared memory
+TILE = 128
+
+
+def is_available():
+    """Return True if a CUDA device can be used."""
+    try:
+        return cuda.is_available()
+    except Exception:
+        return False
+
+
+@cuda.jit(device=True, inline=True)
+def _inv_pow(d, force_exponent):
+    """Return 1/d^n using one division and multiplies instead of pow()."""
+    inv = 1.0 / d
+    if force_exponent == 3:
+        return inv * inv * inv
+    if force_exponent == 1:
+        return inv
+    if force_exponent == 2:
+        return inv * inv
+    if force_exponent == 4:
+        inv2 = inv * inv
+        return inv2 * inv2
+    return inv ** force_exponent
+
+
+@lru_cache(maxsize=None)
+def _haversine_kernel(float_type):
+    """Build the haversine kernel for float32 or float64 inputs."""
+
+    @cuda.jit(fastmath=True)
+    def kernel(s_slat, s_clat, s_slon, s_clon, s_cos,
+               r_slat, r_clat, r_slon, r_clon, r_cos, weights,
+               force_exponent, min_distance_miles, max_distance_miles,
+               max_contribution, potentials, coincident):
+        # One thread per sample; each block stages TILE sources at a time
+        t_slat = cuda.shared.array(TILE, float_type)
+        t_clat = cuda.shared.array(TILE, float_type)
+        t_slon = cuda.shared.array(TILE, float_type)
+        t_clon = cuda.shared.array(TILE, float_type)
+        t_cos = cuda.shared.array(TILE, float_type)
+        t_w = cuda.shared.array(TILE, float_type)
+
+        i = cuda.grid(1)
+        tx = cuda.threadIdx.x
+        num_samples = s_slat.shape[0]
+        num_sources = r_slat.shape[0]
+        active = i < num_samples
+
+        if active:
+            slat = s_slat[i]
+            clat = s_clat[i]
+            slon = s_slon[i]
+            clon = s_clon[i]
+            cos1 = s_cos[i]
+        acc = 0.0
+        hit = False
+
+        for start in range(0, num_sources, TILE):
+            j = start + tx
+            if j < num_sources:
+                t_slat[tx] = r_slat[j]
+                t_clat[tx] = r_clat[j]
+                t_slon[tx] = r_slon[j]
+                t_clon[tx] = r_clon[j]
+                t_cos[tx] = r_cos[j]
+                t_w[tx] = weights[j]
+            cuda.syncthreads()
+
+            if active:
+                for k in range(min(TILE, num_sources - start)):
+                    # NVVM contracts a*b - c*d into an FMA, which does not
+                    # cancel exactly, so test identical points explicitly
+                    if (t_slat[k] == slat and t_clat[k] == clat
+                            and t_slon[k] == slon and t_clon[k] == clon):
+                        d = 0.0
+                    else:
+                        sin_dlat = t_slat[k] * clat - t_clat[k] * slat
+                        sin_dlon = t_slon[k] * clon - t_clon[k] * slon
+                        a = sin_dlat * sin_dlat + cos1 * t_cos[k] * sin_dlon * sin_dlon
+                        d = 2.0 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+                    if d > max_distance_miles:
+                        continue
+                    if d == 0.0 and min_distance_miles == 0.0:
+                        hit = True
+                        continue
+                    acc += min(t_w[k] * _inv_pow(max(d, min_distance_miles), force_exponent),
+                               max_contribution)
+            cuda.syncthreads()
+
+        if active:
+            potentials[i] = acc
+            coincident[i] = hit
+
+    return kernel
+
+
+@lru_cache(maxsize=None)
+def _cos_corrected_kernel(float_type):
+    """Build the cos-corrected (planar miles) kernel for float32 or float64 inputs."""
+
+    @cuda.jit(fastmath=True)
+    def kernel(s_x, s_y, r_x, r_y, weights,
+               force_exponent, min_distance_miles, max_distance_miles,
+               max_contribution, potentials, coincident):
+        t_x = cuda.shared.array(TILE, float_type)
+        t_y = cuda.shared.array(TILE, float_type)
+        t_w = cuda.shared.array(TILE, float_type)
+
+        i = cuda.grid(1)
+        tx = cuda.threadIdx.x
+        num_samples = s_x.shape[0]
+        num_sources = r_x.shape[0]
+        active = i < num_samples
+
+        if active:
+            x = s_x[i]
+            y = s_y[i]
+        acc = 0.0
+        hit = False
+
+        for start in range(0, num_sources, TILE):
+            j = start + tx
+            if j < num_sources:
+                t_x[tx] = r_x[j]
+                t_y[tx] = r_y[j]
+                t_w[tx] = weights[j]
+            cuda.syncthreads()
+
+            if active:
+                for k in range(min(TILE, num_sources - start)):
+                    dx = t_x[k] - x
+                    dy = t_y[k] - y
+                    d = math.sqrt(dx * dx + dy * dy)
+                    if d > max_distance_miles:
+                        continue
+                    if d == 0.0 and min_distance_miles == 0.0:
+                        hit = True
+                        continue
+                    acc += min(t_w[k] * _inv_pow(max(d, min_distance_miles), force_exponent),
+                               max_contribution)
+            cuda.syncthreads()
+
+        if active:
+            potentials[i] = acc
+            coincident[i] = hit
+
+    return kernel
+
+
+def calculate_potential_cuda(sample_coords, source_coords, source_weights,
+                             haversine, force_exponent, min_distance_miles,
+                             max_distance_miles, dtype=np.float64,
+                             max_contribution=np.finfo(np.float64).max):
+    """
+    Run the fused potential kernel on the GPU.
+
+    Parameters
+    ----------
+    sample_coords, source_coords : tuple of ndarray
+        Per-point kernel inputs from potential._kernel_coords()
+    source_weights : ndarray (M,)
+        Source weights
+    haversine : bool
+        True for haversine terms, False for planar cos-corrected miles
+    force_exponent : int
+        Exponent for 1/d^n potential
+    min_distance_miles : float
+        Distances below this are clamped to it
+    max_distance_miles : float
+        Sources beyond this distance are skipped (pass a large finite value
+        for no cutoff)
+    dtype : numpy dtype
+        np.float32 (fast on all GPUs) or np.float64
+    max_contribution : float
+        Cap on each single source's contribution (pass a large finite value
+        for no cap)
+
+    Returns
+    -------
+    tuple (ndarray (N,), ndarray (N,) of bool)
+        Potentials and per-sample coincident-point flags
+    """
+    float_type = float32 if np.dtype(dtype) == np.float32 else float64
+    build = _haversine_kernel if haversine else _cos_corrected_kernel
+    kernel = build(float_type)
+
+    def to_device(array):
+        return cuda.to_device(np.ascontiguousarray(array, dtype=dtype))
+
+    d_samples = [to_device(c) for c in sample_coords]
+    d_sources = [to_device(c) for c in source_coords]
+    d_weights = to_device(source_weights)
+
+    num_samples = len(sample_coords[0])
+    d_potentials = cuda.device_array(num_samples, dtype=np.float64)
+    d_coincident = cuda.device_array(num_samples, dtype=np.bool_)
+
+    blocks = (num_samples + TILE - 1) // TILE
+    kernel[blocks, TILE](
+        *d_samples, *d_sources, d_weights,
+        int(force_exponent), float(min_distance_miles), float(max_distance_miles),
+        float(max_contribution), d_potentials, d_coincident
+    )
+
+    return d_potentials.copy_to_host(), d_coincident.copy_to_host()
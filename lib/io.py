@@ -1,9 +1,21 @@
 """I/O functions for loading and saving data."""
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+try:
+    import pyarrow  # noqa: F401
+    # Arrow's multithreaded parser is several times faster than the C engine
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
-def load_csv(filepath, lon_col='LONGITUDE', lat_col='LATITUDE', weight_col='POPULATION'):
+# Column layout of the headerless potential CSVs written by the calculators
+POTENTIAL_COLUMNS = ['type', 'pop', 'lat', 'lon', 'potential']
+
+
+def load_csv(filepath, lon_col='LONGITUDE', lat_col='LATITUDE', weight_col='POPULATION',
+             dtype=None, usecols=None):
     """
     Load point data from CSV file.
     
@@ -17,6 +29,11 @@ def load_csv(filepath, lon_col='LONGITUDE', lat_col='LATITUDE', weight_col='POPU
         Name of latitude column
     weight_col : str
         Name of weight/population column
+    dtype : dict, optional
+        Column dtypes passed to pd.read_csv (e.g. {lon_col: np.float32}) to
+        skip type inference and reduce memory on large files
+    usecols : list, optional
+        Only read these columns (must include lon_col, lat_col, weight_col)
         
     Returns
     -------
@@ -32,7 +49,7 @@ def load_csv(filepath, lon_col='LONGITUDE', lat_col='LATITUDE', weight_col='POPU
     if not filepath.exists():
         raise FileNotFoundError(f"File not found: {filepath}")
     
-    df = pd.read_csv(filepath)
+    df = pd.read_csv(filepath, dtype=dtype, usecols=usecols, engine=CSV_ENGINE)
     
     # Validate required columns exist
     required = [lon_col, lat_col, weight_col]
@@ -41,3 +58,107 @@ def load_csv(filepath, lon_col='LONGITUDE', lat_col='LATITUDE', weight_col='POPU
         raise ValueError(f"Missing required columns: {missing}")
     
     return df
+
+
+def load_potential_csv(filepath, dtype=None, usecols=None):
+    """
+    Load a headerless potential CSV (type, pop, lat, lon, potential).
+
+    Parameters
+    ----------
+    filepath : str
+        Path to CSV file, e.g. output/census_potential_d3_capped.csv
+    dtype : type or dict, optional
+        Column dtypes passed to pd.read_csv, by column name
+    usecols : list, optional
+        Only read these columns, e.g. skip the string 'type' column
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with POTENTIAL_COLUMNS (or usecols, in file order)
+
+    Notes
+    -----
+    Columns are selected by position and named (and cast) afterwards: the
+    pyarrow engine mislabels columns when usecols is combined with names,
+    and ignores positional dtype keys.
+    """
+    columns = [name for name in POTENTIAL_COLUMNS if usecols is None or name in usecols]
+    positions = [POTENTIAL_COLUMNS.index(name) for name in columns]
+
+    df = pd.read_csv(filepath, header=None, usecols=positions, engine=CSV_ENGINE)
+    df.columns = columns
+    if dtype is not None:
+        df = df.astype(dtype)
+    return df
+
+
+def load_numeric_csv(filepath, skiprows=0, usecols=None, dtype=np.float64, cache=False):
+    """
+    Load an all-numeric CSV (e.g. lon, lat, potential) as a 2-D array.
+
+    A drop-in for np.loadtxt(filepath, delimiter=',', skiprows=skiprows)
+    that uses the C or Arrow parser instead of a Python line loop.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to CSV file
+    skiprows : int
+        Leading lines to skip (1 for a header row)
+    usecols : list of int, optional
+        Only return these column positions
+    dtype : numpy dtype
+        Element type of the returned array (default: np.float64)
+    cache : bool
+        Keep the parsed array as <filepath>.skip<skiprows>.npy and memory-map
+        it on later calls, as long as it is newer than the CSV
+
+    Returns
+    -------
+    ndarray (N, K)
+        Parsed values (read-only when served from the cache)
+    """
+    filepath = Path(filepath)
+    # skiprows changes which rows are parsed, so each value gets its own file
+    cache_path = filepath.with_name(f'{filepath.name}.skip{skiprows}.npy')
+
+    if cache and cache_path.exists() and cache_path.stat().st_mtime >= filepath.stat().st_mtime:
+        data = np.load(cache_path, mmap_mode='r')
+    else:
+        data = pd.read_csv(filepath, header=None, skiprows=skiprows,
+                           dtype=np.float64, engine=CSV_ENGINE).to_numpy()
+        if cache:
+            np.save(cache_path, data)
+
+    if usecols is not None:
+        data = data[:, usecols]
+    return data.astype(dtype, copy=False)
+
+
+def write_rows(f, array, fmt, chunk_rows=65536):
+    """
+    Write each row of a 2-D array as one formatted text line.
+
+    Produces the same text as np.savetxt(f, array, fmt=fmt), but formats
+    chunk_rows lines per % operation instead of one, which is several
+    times faster for OBJ-sized vertex and face blocks.
+
+    Parameters
+    ----------
+    f : file
+        Open text-mode file
+    array : ndarray (N, K)
+        Rows to write
+    fmt : str
+        printf-style format for one row with K fields, without newline
+        (e.g. 'v %.6f %.6f %.6f')
+    chunk_rows : int
+        Rows formatted per call (bounds the temporary tuple and string)
+    """
+    line = fmt + '\n'
+    for start in range(0, len(array), chunk_rows):
+        chunk = array[start:start + chunk_rows]
+        f.write((line * len(chunk)) % tuple(chunk.ravel().tolist()))
+
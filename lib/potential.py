@@ -1,11 +1,36 @@
 """Core potential calculation functions."""
+import os
+from multiprocessing import shared_memory
+
 import numpy as np
 
+from . import geometry
+from .constants import EARTH_RADIUS_MILES, MILES_PER_DEGREE
+
+try:
+    from numba import njit, prange, get_num_threads, set_num_threads
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit so kernels stay importable without numba."""
+        def decorator(fn):
+            return fn
+        return decorator
+
+    prange = range
+
+# fastmath without 'contract': fusing a*b - c*d into an FMA would stop the
+# half-angle differences in the haversine kernel cancelling exactly at d=0.
+_FASTMATH = {'nnan', 'ninf', 'nsz', 'arcp', 'afn', 'reassoc'}
+
 
 def calculate_potential(distances, weights,
                        force_exponent=3,
                        max_distance_miles=None,
-                       min_distance_miles=0):
+                       min_distance_miles=0,
+                       max_contribution=None):
     """
     Calculate potential at sample points from weighted source points.
 
@@ -26,6 +51,8 @@ def calculate_potential(distances, weights,
         Minimum distance for calculations (default: 0.0).
         Distances smaller than this are clamped to this value.
         REQUIRED to be > 0 if any sample point exactly matches a source point.
+    max_contribution : float or None
+        Cap on each single source's contribution (default: None)
 
     Returns
     -------
@@ -54,6 +81,10 @@ def calculate_potential(distances, weights,
     # Calculate raw contributions: weight / distance^exponent
     contributions = weights[np.newaxis, :] / (distances_safe ** force_exponent)
 
+    # Cap each contribution if specified
+    if max_contribution is not None:
+        contributions = np.minimum(contributions, max_contribution)
+
     # Apply max distance cutoff if specified
     if max_distance_miles is not None:
         beyond_max = (distances > max_distance_miles)
@@ -64,11 +95,347 @@ def calculate_potential(distances, weights,
 
     return potentials
 
+
+# The JIT kernels below stream each source array sequentially for every
+# sample and are bound by the sqrt/arcsin per pair, not by memory. Cache
+# blocking (sample blocks x source tiles of 1K-8K) was measured 10-20%
+# slower at both 30K and 400K sources, so the loops are left untiled. The
+# capped planar 1/d^3 loop (85K sources x 20K samples, 1024 x 8192 tiles)
+# measured the same: equal in float64 and ~40% slower in float32.
+@njit(inline='always')
+def _inv_pow(d, force_exponent):
+    """
+    Return 1/d^n using one division and multiplies instead of pow().
+
+    force_exponent is loop-invariant in the kernels, so LLVM unswitches
+    this branch into a separate specialised loop per exponent.
+    """
+    inv = 1.0 / d
+    if force_exponent == 3:
+        return inv * inv * inv
+    if force_exponent == 1:
+        return inv
+    if force_exponent == 2:
+        return inv * inv
+    if force_exponent == 4:
+        inv2 = inv * inv
+        return inv2 * inv2
+    return inv ** force_exponent
+
+
+@njit(inline='always')
+def _haversine_miles(slat1, clat1, slon1, clon1, cos1, slat2, clat2, slon2, clon2, cos2):
+    """Great-circle miles between two points given their haversine_terms()."""
+    sin_dlat = slat2 * clat1 - clat2 * slat1
+    sin_dlon = slon2 * clon1 - clon2 * slon1
+    a = sin_dlat * sin_dlat + cos1 * cos2 * sin_dlon * sin_dlon
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+@njit(inline='always')
+def _planar_miles(x1, y1, x2, y2):
+    """Euclidean miles between two points in cos-corrected planar coordinates."""
+    dx = x2 - x1
+    dy = y2 - y1
+    return np.sqrt(dx * dx + dy * dy)
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _haversine_potential_kernel(sample_sin_half_lat, sample_cos_half_lat,
+                                sample_sin_half_lon, sample_cos_half_lon, sample_cos_lat,
+                                source_sin_half_lat, source_cos_half_lat,
+                                source_sin_half_lon, source_cos_half_lon, source_cos_lat,
+                                source_weights, force_exponent,
+                                min_distance_miles, max_distance_miles, max_contribution):
+    """
+    Fused haversine + 1/d^n reduction, one thread per sample point.
+
+    Takes the per-point terms from geometry.haversine_terms(), so the inner
+    loop has no sin/cos calls. Returns (potentials, coincident) where
+    coincident[i] is True if sample i sits exactly on a source point while
+    min_distance_miles is 0.
+    """
+    num_samples = sample_sin_half_lat.shape[0]
+    num_sources = source_sin_half_lat.shape[0]
+    potentials = np.zeros(num_samples)
+    coincident = np.zeros(num_samples, dtype=np.bool_)
+
+    for i in prange(num_samples):
+        s_slat = sample_sin_half_lat[i]
+        s_clat = sample_cos_half_lat[i]
+        s_slon = sample_sin_half_lon[i]
+        s_clon = sample_cos_half_lon[i]
+        s_cos = sample_cos_lat[i]
+        acc = 0.0
+        for j in range(num_sources):
+            d = _haversine_miles(s_slat, s_clat, s_slon, s_clon, s_cos,
+                                 source_sin_half_lat[j], source_cos_half_lat[j],
+                                 source_sin_half_lon[j], source_cos_half_lon[j],
+                                 source_cos_lat[j])
+
+            if d > max_distance_miles:
+                continue
+            if d == 0.0 and min_distance_miles == 0.0:
+                coincident[i] = True
+                continue
+
+            acc += min(source_weights[j] * _inv_pow(max(d, min_distance_miles), force_exponent),
+                       max_contribution)
+        potentials[i] = acc
+
+    return potentials, coincident
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _cos_corrected_potential_kernel(sample_x, sample_y, source_x, source_y,
+                                    source_weights, force_exponent,
+                                    min_distance_miles, max_distance_miles, max_contribution):
+    """
+    Fused cosine-corrected distance + 1/d^n reduction, one thread per sample.
+
+    x/y are planar coordinates in miles (lon * cos(avg_lat) and lat, both
+    scaled by MILES_PER_DEGREE), so each pair costs a single sqrt.
+    Returns (potentials, coincident) like _haversine_potential_kernel().
+    """
+    num_samples = sample_x.shape[0]
+    num_sources = source_x.shape[0]
+    potentials = np.zeros(num_samples)
+    coincident = np.zeros(num_samples, dtype=np.bool_)
+
+    for i in prange(num_samples):
+        x = sample_x[i]
+        y = sample_y[i]
+        acc = 0.0
+        for j in range(num_sources):
+            d = _planar_miles(x, y, source_x[j], source_y[j])
+
+            if d > max_distance_miles:
+                continue
+            if d == 0.0 and min_distance_miles == 0.0:
+                coincident[i] = True
+                continue
+
+            acc += min(source_weights[j] * _inv_pow(max(d, min_distance_miles), force_exponent),
+                       max_contribution)
+        potentials[i] = acc
+
+    return potentials, coincident
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _haversine_self_potential_kernel(sin_half_lat, cos_half_lat,
+                                     sin_half_lon, cos_half_lon, cos_lat,
+                                     weights, force_exponent,
+                                     min_distance_miles, max_distance_miles,
+                                     max_contribution, num_stripes):
+    """
+    Haversine potential of a point set on itself, one distance per pair.
+
+    Each (i, j > i) distance feeds both potentials. Rows are dealt out to
+    num_stripes threads round-robin (which balances the triangle), and each
+    stripe accumulates into its own row of `partial`, so no atomics are
+    needed. Returns (partial, coincident); potentials are partial.sum(0).
+    """
+    num_points = sin_half_lat.shape[0]
+    partial = np.zeros((num_stripes, num_points))
+    coincident = np.zeros(num_points, dtype=np.bool_)
+
+    for stripe in prange(num_stripes):
+        row = partial[stripe]
+        for i in range(stripe, num_points, num_stripes):
+            slat = sin_half_lat[i]
+            clat = cos_half_lat[i]
+            slon = sin_half_lon[i]
+            clon = cos_half_lon[i]
+            cos_i = cos_lat[i]
+            w_i = weights[i]
+
+            # Self-contribution (distance 0, clamped to min_distance)
+            if min_distance_miles == 0.0:
+                coincident[i] = True
+            else:
+                row[i] += min(w_i * _inv_pow(min_distance_miles, force_exponent),
+                              max_contribution)
+
+            acc = 0.0
+            for j in range(i + 1, num_points):
+                d = _haversine_miles(slat, clat, slon, clon, cos_i,
+                                     sin_half_lat[j], cos_half_lat[j],
+                                     sin_half_lon[j], cos_half_lon[j], cos_lat[j])
+
+                if d > max_distance_miles:
+                    continue
+                if d == 0.0 and min_distance_miles == 0.0:
+                    coincident[i] = True
+                    continue
+
+                f = _inv_pow(max(d, min_distance_miles), force_exponent)
+                acc += min(weights[j] * f, max_contribution)
+                row[j] += min(w_i * f, max_contribution)
+            row[i] += acc
+
+    return partial, coincident
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def _cos_corrected_self_potential_kernel(x, y, weights, force_exponent,
+                                         min_distance_miles, max_distance_miles,
+                                         max_contribution, num_stripes):
+    """Cos-corrected counterpart of _haversine_self_potential_kernel()."""
+    num_points = x.shape[0]
+    partial = np.zeros((num_stripes, num_points))
+    coincident = np.zeros(num_points, dtype=np.bool_)
+
+    for stripe in prange(num_stripes):
+        row = partial[stripe]
+        for i in range(stripe, num_points, num_stripes):
+            x_i = x[i]
+            y_i = y[i]
+            w_i = weights[i]
+
+            # Self-contribution (distance 0, clamped to min_distance)
+            if min_distance_miles == 0.0:
+                coincident[i] = True
+            else:
+                row[i] += min(w_i * _inv_pow(min_distance_miles, force_exponent),
+                              max_contribution)
+
+            acc = 0.0
+            for j in range(i + 1, num_points):
+                d = _planar_miles(x_i, y_i, x[j], y[j])
+
+                if d > max_distance_miles:
+                    continue
+                if d == 0.0 and min_distance_miles == 0.0:
+                    coincident[i] = True
+                    continue
+
+                f = _inv_pow(max(d, min_distance_miles), force_exponent)
+                acc += min(weights[j] * f, max_contribution)
+                row[j] += min(w_i * f, max_contribution)
+            row[i] += acc
+
+    return partial, coincident
+
+
+def _kernel_coords(sample_lons, sample_lats, source_lons, source_lats, distance_fn, avg_lat):
+    """
+    Per-point inputs for the fused kernels as (sample_coords, source_coords).
+
+    Haversine kernels take geometry.haversine_terms(); cos-corrected kernels
+    take planar (x, y) miles. Planar coordinates are centred before scaling
+    so they keep precision if downcast to float32.
+    """
+    if distance_fn is geometry.haversine_distance:
+        return (geometry.haversine_terms(sample_lons, sample_lats),
+                geometry.haversine_terms(source_lons, source_lats))
+
+    lon0 = np.mean(np.concatenate([sample_lons, source_lons]))
+    x_scale = np.cos(np.radians(avg_lat)) * MILES_PER_DEGREE
+    return (((sample_lons - lon0) * x_scale, (sample_lats - avg_lat) * MILES_PER_DEGREE),
+            ((source_lons - lon0) * x_scale, (source_lats - avg_lat) * MILES_PER_DEGREE))
+
+
+def _calculate_potential_jit(sample_lons, sample_lats,
+                             source_lons, source_lats, source_weights,
+                             distance_fn, force_exponent, min_distance_miles,
+                             max_distance_miles, max_contribution, n_jobs, dtype, avg_lat):
+    """Run the numba kernel matching distance_fn; see calculate_potential_chunked()."""
+    sample_lons = np.asarray(sample_lons, dtype=np.float64)
+    sample_lats = np.asarray(sample_lats, dtype=np.float64)
+    source_lons = np.asarray(source_lons, dtype=np.float64)
+    source_lats = np.asarray(source_lats, dtype=np.float64)
+
+    # Sampling at the sources themselves: d(i, j) == d(j, i), so each pair
+    # only needs computing once
+    symmetric = (np.array_equal(sample_lons, source_lons)
+                 and np.array_equal(sample_lats, source_lats))
+
+    sample_coords, source_coords = _kernel_coords(
+        sample_lons, sample_lats, source_lons, source_lats, distance_fn, avg_lat
+    )
+    if distance_fn is geometry.haversine_distance:
+        kernel = _haversine_self_potential_kernel if symmetric else _haversine_potential_kernel
+    else:
+        kernel = _cos_corrected_self_potential_kernel if symmetric else _cos_corrected_potential_kernel
+    coords = source_coords if symmetric else (*sample_coords, *source_coords)
+
+    # One contiguous array per field (SoA) so the inner loop streams
+    coords = tuple(np.ascontiguousarray(c, dtype=dtype) for c in coords)
+    source_weights = np.ascontiguousarray(source_weights, dtype=dtype)
+
+    # fastmath assumes finite values, so "no cutoff" (or cap) is the largest
+    # finite float
+    max_distance = (np.finfo(np.float64).max if max_distance_miles is None
+                    else float(max_distance_miles))
+    cap = np.finfo(np.float64).max if max_contribution is None else float(max_contribution)
+
+    previous_threads = get_num_threads()
+    if n_jobs > 0:
+        set_num_threads(min(n_jobs, previous_threads))
+    try:
+        args = (*coords, source_weights,
+                int(force_exponent), float(min_distance_miles), max_distance, cap)
+        if symmetric:
+            partial, coincident = kernel(*args, get_num_threads())
+            potentials = partial.sum(axis=0)
+        else:
+            potentials, coincident = kernel(*args)
+    finally:
+        set_num_threads(previous_threads)
+
+    if np.any(coincident):
+        raise ValueError(
+            "Sample point(s) exactly match source point(s) (distance=0). "
+            "Set min_distance_miles > 0 to avoid singularity. "
+            "Typical values: 0.5-1.0 miles for census centroids."
+        )
+
+    return potentials
+
+
+def _calculate_potential_gpu(sample_lons, sample_lats,
+                             source_lons, source_lats, source_weights,
+                             distance_fn, force_exponent, min_distance_miles,
+                             max_distance_miles, max_contribution, dtype, avg_lat):
+    """Run the CUDA kernel matching distance_fn; see calculate_potential_chunked()."""
+    from . import gpu
+
+    sample_coords, source_coords = _kernel_coords(
+        np.asarray(sample_lons, dtype=np.float64), np.asarray(sample_lats, dtype=np.float64),
+        np.asarray(source_lons, dtype=np.float64), np.asarray(source_lats, dtype=np.float64),
+        distance_fn, avg_lat
+    )
+    max_distance = (np.finfo(np.float64).max if max_distance_miles is None
+                    else float(max_distance_miles))
+    cap = np.finfo(np.float64).max if max_contribution is None else float(max_contribution)
+
+    potentials, coincident = gpu.calculate_potential_cuda(
+        sample_coords, source_coords, source_weights,
+        distance_fn is geometry.haversine_distance,
+        force_exponent, min_distance_miles, max_distance, dtype, cap
+    )
+
+    if np.any(coincident):
+        raise ValueError(
+            "Sample point(s) exactly match source point(s) (distance=0). "
+            "Set min_distance_miles > 0 to avoid singularity. "
+            "Typical values: 0.5-1.0 miles for census centroids."
+        )
+
+    return potentials
+
+
+# Distance functions with a fused numba kernel
+_JIT_DISTANCE_FNS = (geometry.haversine_distance, geometry.cos_corrected_distance)
+
+
 def calculate_potential_chunked(sample_lons, sample_lats,
                                 source_lons, source_lats, source_weights,
                                 distance_fn, force_exponent=3, chunk_size=1000,
                                 min_distance_miles=0.0, max_distance_miles=None,
-                                n_jobs=1):
+                                n_jobs=1, dtype=np.float64, use_gpu=False,
+                                max_contribution=None):
     """
     Calculate potential at sample points from source points using chunked processing.
 
@@ -96,6 +463,30 @@ def calculate_potential_chunked(sample_lons, sample_lats,
     n_jobs : int
         Number of parallel jobs (default: 1 = sequential).
         Use -1 for all available cores.
+    dtype : numpy dtype
+        Floating-point type for coordinates and weights inside the distance
+        calculation (default: np.float64). np.float32 halves memory traffic
+        at ~1e-4 relative error; potentials are still summed in float64.
+    use_gpu : bool
+        Run the fused kernel on a CUDA GPU via numba.cuda (default: False).
+        Falls back to the CPU path if no CUDA device is available. Use
+        dtype=np.float32 on consumer GPUs, whose float64 rate is low.
+    max_contribution : float or None
+        Cap on each single source's contribution (default: None = no cap),
+        e.g. 500000 to keep tracts right next to a sample from dominating.
+
+    Notes
+    -----
+    When numba is installed and distance_fn is geometry.haversine_distance or
+    geometry.cos_corrected_distance, the work is done by a fused,
+    multithreaded JIT kernel that never builds a distance matrix
+    (chunk_size is then ignored). Any other distance_fn uses the NumPy
+    chunked path.
+
+    When max_distance_miles is set, a scipy KD-tree limits each chunk to
+    sources near its samples, so cost scales with the number of neighbors
+    rather than with M. Pruning uses unwrapped longitudes, so pairs that
+    straddle the antimeridian are treated as far apart.
 
     Returns
     -------
@@ -107,76 +498,292 @@ def calculate_potential_chunked(sample_lons, sample_lats,
     ValueError
         If any sample point exactly matches a source point and min_distance_miles is 0
     """
-    num_samples = len(sample_lons)
-    potentials = np.zeros(num_samples)
-
     # Pre-calculate avg_lat for consistency across chunks
     # (for distance functions that need it like cos_corrected_distance)
     all_lats = np.concatenate([sample_lats, source_lats])
     avg_lat = np.mean(all_lats)
 
-    # Process in chunks
-    num_chunks = (num_samples + chunk_size - 1) // chunk_size
-
-    # Define chunk processing function
-    def process_chunk(chunk_idx):
-        """Process a single chunk and return (start_idx, end_idx, chunk_potentials)."""
-        start_idx = chunk_idx * chunk_size
-        end_idx = min(start_idx + chunk_size, num_samples)
-
-        # Get chunk of sample points
-        chunk_lons = sample_lons[start_idx:end_idx]
-        chunk_lats = sample_lats[start_idx:end_idx]
-
-        # Calculate distances using provided function
-        # Result: (chunk_size, num_sources) distance matrix
-        # Try passing avg_lat if the function accepts it
-        try:
-            distances = distance_fn(chunk_lons, chunk_lats, source_lons, source_lats, avg_lat)
-        except TypeError:
-            # Function doesn't take avg_lat parameter (e.g., haversine)
-            distances = distance_fn(chunk_lons, chunk_lats, source_lons, source_lats)
-
-        # Check for division by zero
-        if min_distance_miles == 0 and np.any(distances == 0):
-            raise ValueError(
-                "Sample point(s) exactly match source point(s) (distance=0). "
-                "Set min_distance_miles > 0 to avoid singularity. "
-                "Typical values: 0.5-1.0 miles for census centroids."
+    if use_gpu and HAS_NUMBA and distance_fn in _JIT_DISTANCE_FNS:
+        from . import gpu
+        if gpu.is_available():
+            return _calculate_potential_gpu(
+                sample_lons, sample_lats,
+                source_lons, source_lats, source_weights,
+                distance_fn, force_exponent, min_distance_miles,
+                max_distance_miles, max_contribution, dtype, avg_lat
             )
+        print("  CUDA device not available, using CPU")
 
-        # Apply minimum distance clamping if specified
-        if min_distance_miles > 0:
-            distances_safe = np.maximum(distances, min_distance_miles)
-        else:
-            distances_safe = distances
+    if max_distance_miles is not None:
+        return _calculate_potential_pruned(
+            sample_lons, sample_lats,
+            source_lons, source_lats, source_weights,
+            distance_fn, force_exponent, chunk_size,
+            min_distance_miles, max_distance_miles, max_contribution, n_jobs, dtype, avg_lat
+        )
 
-        # Calculate contributions: weight / distance^exponent
-        contributions = source_weights[np.newaxis, :] / (distances_safe ** force_exponent)
+    return _calculate_potential_dense(
+        sample_lons, sample_lats,
+        source_lons, source_lats, source_weights,
+        distance_fn, force_exponent, chunk_size,
+        min_distance_miles, max_distance_miles, max_contribution, n_jobs, dtype, avg_lat
+    )
 
-        # Apply max distance cutoff if specified
-        if max_distance_miles is not None:
-            beyond_max = (distances > max_distance_miles)
-            contributions = np.where(beyond_max, 0.0, contributions)
 
-        # Sum contributions for each sample point in this chunk
-        chunk_potentials = np.sum(contributions, axis=1)
-        return (start_idx, end_idx, chunk_potentials)
+def _calculate_potential_pruned(sample_lons, sample_lats,
+                                source_lons, source_lats, source_weights,
+                                distance_fn, force_exponent, chunk_size,
+                                min_distance_miles, max_distance_miles, max_contribution,
+                                n_jobs, dtype, avg_lat):
+    """
+    Skip sources beyond max_distance_miles using a KD-tree.
 
-    # Process chunks (parallel or sequential)
-    if n_jobs == 1:
-        # Sequential processing
-        for chunk_idx in range(num_chunks):
-            start_idx, end_idx, chunk_potentials = process_chunk(chunk_idx)
-            potentials[start_idx:end_idx] = chunk_potentials
+    Samples are visited in KD-tree leaf order so each chunk is spatially
+    compact; a chunk is then evaluated against only the union of sources
+    within max_distance_miles of its samples. The projection uses the
+    smallest cos(lat) in the data, so planar distances never exceed true
+    distances and no in-range source is dropped. The exact cutoff is still
+    applied by the dense calculation.
+    """
+    from scipy.spatial import cKDTree
+
+    sample_lons = np.asarray(sample_lons)
+    sample_lats = np.asarray(sample_lats)
+    source_lons = np.asarray(source_lons)
+    source_lats = np.asarray(source_lats)
+    source_weights = np.asarray(source_weights)
+
+    max_abs_lat = min(max(np.abs(sample_lats).max(), np.abs(source_lats).max()), 89.0)
+    x_scale = np.cos(np.radians(max_abs_lat)) * MILES_PER_DEGREE
+
+    def project(lons, lats):
+        return np.column_stack([lons * x_scale, lats * MILES_PER_DEGREE])
+
+    sample_xy = project(sample_lons, sample_lats)
+    source_tree = cKDTree(project(source_lons, source_lats))
+    order = cKDTree(sample_xy).indices
+    # 1% slack covers great-circle vs planar differences at these ranges
+    radius = max_distance_miles * 1.01
+
+    num_samples = len(sample_lons)
+    potentials = np.zeros(num_samples)
+    use_jit = HAS_NUMBA and distance_fn in _JIT_DISTANCE_FNS
+
+    def process_chunk(start_idx):
+        """Evaluate one spatially compact chunk against its nearby sources."""
+        chunk = order[start_idx:start_idx + chunk_size]
+        neighbors = source_tree.query_ball_point(sample_xy[chunk], r=radius)
+        nearby = np.unique(np.concatenate([np.asarray(n, dtype=np.intp) for n in neighbors]))
+        if len(nearby) == 0:
+            return chunk, np.zeros(len(chunk))
+
+        chunk_potentials = _calculate_potential_dense(
+            sample_lons[chunk], sample_lats[chunk],
+            source_lons[nearby], source_lats[nearby], source_weights[nearby],
+            distance_fn, force_exponent, len(chunk),
+            min_distance_miles, max_distance_miles, max_contribution,
+            n_jobs if use_jit else 1, dtype, avg_lat
+        )
+        return chunk, chunk_potentials
+
+    starts = range(0, num_samples, chunk_size)
+    if n_jobs == 1 or use_jit:
+        # JIT kernel is already multithreaded within each chunk
+        results = (process_chunk(start_idx) for start_idx in starts)
     else:
-        # Parallel processing
         from joblib import Parallel, delayed
-        print(f"  Processing {num_chunks} chunks with {n_jobs} parallel jobs...")
-        results = Parallel(n_jobs=n_jobs, verbose=10)(
-            delayed(process_chunk)(chunk_idx) for chunk_idx in range(num_chunks)
+        print(f"  Processing {len(starts)} chunks with {n_jobs} parallel jobs...")
+        results = Parallel(n_jobs=n_jobs, verbose=10, prefer='threads')(
+            delayed(process_chunk)(start_idx) for start_idx in starts
+        )
+
+    for chunk, chunk_potentials in results:
+        potentials[chunk] = chunk_potentials
+
+    return potentials
+
+
+def _calculate_potential_dense(sample_lons, sample_lats,
+                               source_lons, source_lats, source_weights,
+                               distance_fn, force_exponent, chunk_size,
+                               min_distance_miles, max_distance_miles, max_contribution,
+                               n_jobs, dtype, avg_lat):
+    """Evaluate every sample against every source; see calculate_potential_chunked()."""
+    if HAS_NUMBA and distance_fn in _JIT_DISTANCE_FNS:
+        return _calculate_potential_jit(
+            sample_lons, sample_lats,
+            source_lons, source_lats, source_weights,
+            distance_fn, force_exponent, min_distance_miles, max_distance_miles,
+            max_contribution, n_jobs, dtype, avg_lat
         )
-        for start_idx, end_idx, chunk_potentials in results:
-            potentials[start_idx:end_idx] = chunk_potentials
 
+    if dtype != np.float64:
+        sample_lons = np.ascontiguousarray(sample_lons, dtype=dtype)
+        sample_lats = np.ascontiguousarray(sample_lats, dtype=dtype)
+        source_lons = np.ascontiguousarray(source_lons, dtype=dtype)
+        source_lats = np.ascontiguousarray(source_lats, dtype=dtype)
+
+    num_samples = len(sample_lons)
+    potentials = np.zeros(num_samples)
+
+    if n_jobs == 1:
+        # Sequential processing
+        for start_idx in range(0, num_samples, chunk_size):
+            end_idx = min(start_idx + chunk_size, num_samples)
+            potentials[start_idx:end_idx] = _dense_chunk(
+                sample_lons[start_idx:end_idx], sample_lats[start_idx:end_idx],
+                source_lons, source_lats, source_weights,
+                distance_fn, force_exponent, min_distance_miles, max_distance_miles,
+                max_contribution, avg_lat
+            )
+        return potentials
+
+    # Parallel processing: one contiguous range of samples per worker process
+    n_workers = os.cpu_count() + 1 + n_jobs if n_jobs < 0 else n_jobs
+    n_workers = max(1, min(n_workers, num_samples))
+    bounds = np.linspace(0, num_samples, n_workers + 1).astype(int)
+    print(f"  Processing {num_samples} samples with {n_workers} worker processes...")
+
+    # joblib's loky executor starts clean worker processes: forking after
+    # numba's TBB pool is running hangs, and spawn would re-run unguarded
+    # scripts. Sources are shared zero-copy: one block holds lons, lats and
+    # weights, attached once per worker by _init_dense_worker.
+    from joblib.externals.loky.process_executor import ProcessPoolExecutor
+    shm = shared_memory.SharedMemory(create=True, size=3 * len(source_lons) * 8)
+    try:
+        sources = np.ndarray((3, len(source_lons)), dtype=np.float64, buffer=shm.buf)
+        sources[0] = source_lons
+        sources[1] = source_lats
+        sources[2] = source_weights
+        del sources  # release the view so the block can be closed
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_dense_worker,
+            initargs=(shm.name, len(source_lons), dtype, distance_fn, force_exponent,
+                      min_distance_miles, max_distance_miles, max_contribution, avg_lat)
+        ) as executor:
+            futures = [
+                executor.submit(_dense_worker_range,
+                                sample_lons[start_idx:end_idx], sample_lats[start_idx:end_idx],
+                                chunk_size)
+                for start_idx, end_idx in zip(bounds[:-1], bounds[1:])
+            ]
+            for start_idx, end_idx, future in zip(bounds[:-1], bounds[1:], futures):
+                potentials[start_idx:end_idx] = future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return potentials
+
+
+def _dense_chunk(chunk_lons, chunk_lats, source_lons, source_lats, source_weights,
+                 distance_fn, force_exponent, min_distance_miles, max_distance_miles,
+                 max_contribution, avg_lat):
+    """Return the potential at one chunk of samples from a full distance matrix."""
+    # Calculate distances using provided function
+    # Result: (chunk_size, num_sources) distance matrix
+    # Try passing avg_lat if the function accepts it
+    try:
+        distances = distance_fn(chunk_lons, chunk_lats, source_lons, source_lats, avg_lat)
+    except TypeError:
+        # Function doesn't take avg_lat parameter (e.g., haversine)
+        distances = distance_fn(chunk_lons, chunk_lats, source_lons, source_lats)
+
+    # Check for division by zero
+    if min_distance_miles == 0 and np.any(distances == 0):
+        raise ValueError(
+            "Sample point(s) exactly match source point(s) (distance=0). "
+            "Set min_distance_miles > 0 to avoid singularity. "
+            "Typical values: 0.5-1.0 miles for census centroids."
+        )
+
+    # Everything below reuses the distance buffer in place, so the chunk
+    # never holds more than one (chunk_size, num_sources) float array
+    if max_distance_miles is not None:
+        beyond_max = (distances > max_distance_miles)
+
+    # Apply minimum distance clamping if specified
+    if min_distance_miles > 0:
+        np.maximum(distances, min_distance_miles, out=distances)
+
+    # Calculate contributions: weight * (1/distance)^exponent, using one
+    # reciprocal and multiplies instead of a pow() per element
+    np.reciprocal(distances, out=distances)
+    _INV_POWERS.get(force_exponent, _power_inplace)(distances, force_exponent)
+    contributions = np.multiply(distances, source_weights[np.newaxis, :], out=distances)
+
+    # Cap each contribution if specified
+    if max_contribution is not None:
+        np.minimum(contributions, max_contribution, out=contributions)
+
+    # Apply max distance cutoff if specified
+    if max_distance_miles is not None:
+        contributions[beyond_max] = 0.0
+
+    # Sum contributions for each sample point in this chunk
+    return np.sum(contributions, axis=1)
+
+
+def _square_inplace(inv, force_exponent):
+    np.square(inv, out=inv)
+
+
+def _cube_inplace(inv, force_exponent):
+    # Row at a time through a 1-D scratch so the chunk keeps a single buffer
+    squared = np.empty(inv.shape[1], dtype=inv.dtype)
+    for row in inv:
+        np.square(row, out=squared)
+        row *= squared
+
+
+def _fourth_inplace(inv, force_exponent):
+    np.square(inv, out=inv)
+    np.square(inv, out=inv)
+
+
+def _power_inplace(inv, force_exponent):
+    np.power(inv, force_exponent, out=inv)
+
+
+# Raise an (N, M) array of 1/d to force_exponent in place; exponents not
+# listed fall back to _power_inplace
+_INV_POWERS = {
+    1: lambda inv, force_exponent: None,
+    2: _square_inplace,
+    3: _cube_inplace,
+    4: _fourth_inplace,
+}
+
+
+# Per-process state for the NumPy worker pool, set once by _init_dense_worker
+# so the source arrays are not pickled with every task
+_worker_shm = None
+_worker_args = None
+
+
+def _init_dense_worker(shm_name, num_sources, dtype, distance_fn, force_exponent,
+                       min_distance_miles, max_distance_miles, max_contribution, avg_lat):
+    """Attach to the shared source block and store the fixed kernel arguments."""
+    global _worker_shm, _worker_args
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    sources = np.ndarray((3, num_sources), dtype=np.float64, buffer=_worker_shm.buf)
+    source_lons, source_lats, source_weights = sources
+    if dtype != np.float64:
+        source_lons = source_lons.astype(dtype)
+        source_lats = source_lats.astype(dtype)
+    _worker_args = (source_lons, source_lats, source_weights, distance_fn,
+                    force_exponent, min_distance_miles, max_distance_miles,
+                    max_contribution, avg_lat)
+
+
+def _dense_worker_range(sample_lons, sample_lats, chunk_size):
+    """Evaluate one worker's range of samples, chunk_size samples at a time."""
+    potentials = np.empty(len(sample_lons))
+    for start_idx in range(0, len(sample_lons), chunk_size):
+        end_idx = start_idx + chunk_size
+        potentials[start_idx:end_idx] = _dense_chunk(
+            sample_lons[start_idx:end_idx], sample_lats[start_idx:end_idx], *_worker_args
+        )
     return potentials
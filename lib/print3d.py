@@ -0,0 +1,138 @@
+"""Helpers for 3D-print outputs (print-bed layout, height, preview meshes and STL)."""
+import numpy as np
+
+# Binary STL triangle record: normal, three corners, attribute byte count
+STL_RECORD_DTYPE = np.dtype([('normal', '<f4', (3,)),
+                             ('vectors', '<f4', (3, 3)),
+                             ('attr', '<u2')])
+
+
+def fit_to_base(lon_range, lat_range, base_width_cm=25.0, base_height_cm=15.0):
+    """
+    Scale a lon/lat extent to fit a print base, preserving aspect ratio.
+
+    The extent is fitted against both sides of the base, so a region that is
+    wider than tall but not as wide as the base is constrained by height.
+
+    Parameters
+    ----------
+    lon_range, lat_range : float
+        Extent of the data in degrees
+    base_width_cm : float
+        Print base width in cm (longitude direction)
+    base_height_cm : float
+        Print base depth in cm (latitude direction)
+
+    Returns
+    -------
+    tuple (float, float, float)
+        (cm per degree, actual width in cm, actual height in cm)
+    """
+    scale = min(base_width_cm / lon_range, base_height_cm / lat_range)
+    return scale, lon_range * scale, lat_range * scale
+
+
+def normalize_height(values, max_z_cm, dtype=np.float32):
+    """
+    Linearly map values onto [0, max_z_cm] in a single output buffer.
+
+    Parameters
+    ----------
+    values : ndarray
+        Potential (or other) values of any shape
+    max_z_cm : float
+        Height given to the largest value
+    dtype : numpy dtype
+        Output type (default: np.float32, ample for print coordinates)
+
+    Returns
+    -------
+    ndarray
+        Heights with the shape of values; all zeros if values are constant
+    """
+    z_min, z_max = values.min(), values.max()
+    z = np.empty_like(values, dtype=dtype)
+    np.subtract(values, z_min, out=z)
+    if z_max > z_min:
+        z *= max_z_cm / (z_max - z_min)
+    return z
+
+
+def decimate_mesh(vertices, faces, cell_size):
+    """
+    Simplify a height-field mesh by clustering vertices on an x/y grid.
+
+    Vertices sharing a cell_size square are merged into their mean, faces
+    are re-indexed, and faces that collapse or duplicate another are
+    dropped. Dense regions lose the most vertices while sparse ones are
+    kept as they are, which suits Plotly previews of tract meshes.
+
+    Parameters
+    ----------
+    vertices : ndarray (N, 3)
+        Vertex (x, y, z) coordinates
+    faces : ndarray (T, 3)
+        Vertex indices of each triangle
+    cell_size : float
+        Clustering cell side, in the units of x and y
+
+    Returns
+    -------
+    tuple (ndarray (K, 3), ndarray (F, 3))
+        Merged vertices and the surviving faces indexing them
+    """
+    ij = np.floor((vertices[:, :2] - vertices[:, :2].min(axis=0)) / cell_size).astype(np.int64)
+    key = (ij[:, 0] << 32) | ij[:, 1]
+    _, cluster = np.unique(key, return_inverse=True)
+    cluster = cluster.ravel()
+
+    counts = np.bincount(cluster)
+    merged = np.column_stack([np.bincount(cluster, weights=vertices[:, k]) / counts
+                              for k in range(3)])
+
+    faces = cluster[faces]
+    faces = faces[(faces[:, 0] != faces[:, 1])
+                  & (faces[:, 1] != faces[:, 2])
+                  & (faces[:, 0] != faces[:, 2])]
+    _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    return merged, faces[np.sort(first)]
+
+
+def write_stl(output_path, vertices, faces, header=b'fieldregions binary STL',
+              chunk_size=100_000):
+    """
+    Write a binary STL straight from an indexed triangle mesh.
+
+    Triangles are gathered, given unit normals and written chunk_size at a
+    time, so peak memory is one chunk of records rather than the whole
+    (T, 3, 3) vector array a numpy-stl Mesh would hold.
+
+    Parameters
+    ----------
+    output_path : str or Path
+        Destination .stl file
+    vertices : ndarray (N, 3)
+        Vertex (x, y, z) coordinates, in the print's units (slicers assume mm)
+    faces : ndarray (T, 3)
+        Vertex indices of each triangle
+    header : bytes
+        Header text, truncated or null-padded to 80 bytes
+    chunk_size : int
+        Triangles per write
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    with open(output_path, 'wb') as f:
+        f.write(header[:80].ljust(80, b'\0'))
+        f.write(np.uint32(len(faces)).tobytes())
+
+        for start in range(0, len(faces), chunk_size):
+            vectors = vertices[faces[start:start + chunk_size]]
+            normals = np.cross(vectors[:, 1] - vectors[:, 0], vectors[:, 2] - vectors[:, 0])
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+            records = np.zeros(len(vectors), dtype=STL_RECORD_DTYPE)
+            records['normal'] = normals
+            records['vectors'] = vectors
+            f.write(records.tobytes())
+
@@ -5,7 +5,7 @@ Population Potential Calculator
 Calculate population potential fields from weighted point datasets.
 
 Usage:
-    python3 src/cli/calculate_potential.py <input_csv> [min_distance] [max_distance] [--jobs N] [--output FILE]
+    python3 src/cli/calculate_potential.py <input_csv> [min_distance] [max_distance] [--jobs N] [--output FILE] [--float32] [--gpu]
 
 Examples:
     python3 src/cli/calculate_potential.py res/tracts_sf_bay.csv
@@ -13,6 +13,8 @@ Examples:
     python3 src/cli/calculate_potential.py res/tracts_sf_bay.csv 1.0 50  # Smooth + local only
     python3 src/cli/calculate_potential.py res/blockgroups_conus.csv 0.8 --jobs 4  # Use 4 cores
     python3 src/cli/calculate_potential.py res/blockgroups_conus.csv 0.8 --jobs 4 --output output/conus_0.8mile.csv
+    python3 src/cli/calculate_potential.py res/blockgroups_conus.csv 0.8 --float32  # Half the memory traffic
+    python3 src/cli/calculate_potential.py res/blockgroups_conus.csv 0.8 --gpu --float32  # CUDA GPU
 """
 import numpy as np
 import sys
@@ -32,13 +34,15 @@ def main():
 
     # Parse command line arguments
     if len(sys.argv) < 2:
-        print("\nUsage: python3 calculate_potential.py <input_csv> [min_distance] [max_distance] [--jobs N] [--output FILE]")
+        print("\nUsage: python3 calculate_potential.py <input_csv> [min_distance] [max_distance] [--jobs N] [--output FILE] [--float32] [--gpu]")
         print("\nExamples:")
         print("  python3 calculate_potential.py res/tracts_sf_bay.csv")
         print("  python3 calculate_potential.py res/tracts_sf_bay.csv 1.0")
         print("  python3 calculate_potential.py res/tracts_sf_bay.csv 1.0 50")
         print("  python3 calculate_potential.py res/blockgroups_conus.csv 0.8 --jobs 4")
         print("  python3 calculate_potential.py res/blockgroups_conus.csv 0.8 --jobs 4 --output output/conus_0.8mile.csv")
+        print("  python3 calculate_potential.py res/blockgroups_conus.csv 0.8 --float32")
+        print("  python3 calculate_potential.py res/blockgroups_conus.csv 0.8 --gpu --float32")
         sys.exit(1)
 
     # Parse --jobs flag first to know which args to skip
@@ -57,6 +61,12 @@ def main():
             output_file = sys.argv[i + 1]
             output_value = sys.argv[i + 1]
 
+    # Parse --float32 flag (single-precision distance kernel)
+    dtype = np.float32 if '--float32' in sys.argv else np.float64
+
+    # Parse --gpu flag (CUDA kernel, falls back to CPU)
+    use_gpu = '--gpu' in sys.argv
+
     # Parse positional args (excluding flag values)
     flag_values = {jobs_value, output_value} - {None}
     args = [a for a in sys.argv[1:] if not a.startswith('--') and a not in flag_values]
@@ -85,6 +95,8 @@ def main():
     print(f"  Min distance: {min_distance} miles {'(no smoothing)' if min_distance == 0 else '(census centroid smoothing)'}")
     print(f"  Max distance: {max_distance if max_distance else 'unlimited'}")
     print(f"  Parallel jobs: {n_jobs}")
+    print(f"  Precision: {np.dtype(dtype).name}")
+    print(f"  GPU: {'requested' if use_gpu else 'no'}")
 
     # Calculate potential using chunked method (memory-efficient)
     print("\nCalculating potential (chunked processing)...")
@@ -96,7 +108,9 @@ def main():
         chunk_size=1000,
         min_distance_miles=min_distance,
         max_distance_miles=max_distance,
-        n_jobs=n_jobs
+        n_jobs=n_jobs,
+        dtype=dtype,
+        use_gpu=use_gpu
     )
 
     elapsed = (datetime.now() - start_time).total_seconds()
@@ -8,6 +8,7 @@ Uses watershed algorithm on regular 2D grid.
 import argparse
 import csv
 import sys
+from collections import deque
 import numpy as np
 from scipy import ndimage
 from scipy.ndimage import label
@@ -103,12 +104,12 @@ def find_peaks_and_prominences(pot_grid, pop_grid, min_prominence=100):
         # Track the maximum "low point" encountered (the saddle)
 
         visited = np.zeros_like(data, dtype=bool)
-        queue = [(peak_i, peak_j)]
+        queue = deque([(peak_i, peak_j)])
         visited[peak_i, peak_j] = True
         key_col = -np.inf
 
         while queue:
-            i, j = queue.pop(0)
+            i, j = queue.popleft()
             current_pot = data[i, j]
 
             # Check 8 neighbors
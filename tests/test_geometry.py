@@ -96,3 +96,58 @@ def test_distance_functions_comparable():
 
     # Should agree within 1% for short distances
     np.testing.assert_allclose(d_cos, d_hav, rtol=0.01)
+
+
+def test_triangulate_cached(tmp_path):
+    """Test cached triangulation matches Delaunay and is reused from disk."""
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0.0, 1.0, (50, 2))
+
+    simplices = geometry.triangulate_cached(points, cache_dir=tmp_path)
+    np.testing.assert_array_equal(simplices, geometry.triangulate(points).simplices)
+    assert len(list(tmp_path.glob('delaunay_*.npy'))) == 1
+
+    # Second call loads the cached file
+    cached = geometry.triangulate_cached(points, cache_dir=tmp_path)
+    np.testing.assert_array_equal(cached, simplices)
+    assert len(list(tmp_path.glob('delaunay_*.npy'))) == 1
+
+    # Different points get their own cache entry
+    geometry.triangulate_cached(points[:40], cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('delaunay_*.npy'))) == 2
+
+
+def test_calculate_triangle_centers():
+    """Test centers are corner means, from a Delaunay object or bare simplices."""
+    points = np.array([[0.0, 0.0], [3.0, 0.0], [0.0, 3.0], [3.0, 3.0]])
+    tri = geometry.triangulate(points)
+
+    centers = geometry.calculate_triangle_centers(points, tri)
+    expected = np.array([points[s].mean(axis=0) for s in tri.simplices])
+
+    np.testing.assert_array_equal(centers, expected)
+    np.testing.assert_array_equal(
+        geometry.calculate_triangle_centers(points, tri.simplices), expected)
+    assert centers.shape == (2, 2)
+
+
+def test_triangulate_cached_triangle_backend(tmp_path):
+    """Test the triangle backend finds the same triangles as qhull."""
+    pytest.importorskip('triangle')
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0.0, 1.0, (200, 2))
+
+    simplices = geometry.triangulate_cached(points, cache_dir=tmp_path, backend='triangle')
+    expected = geometry.triangulate(points).simplices
+
+    def triangle_set(s):
+        return {tuple(row) for row in np.sort(s, axis=1)}
+
+    assert triangle_set(simplices) == triangle_set(expected)
+    assert len(list(tmp_path.glob('triangle_*.npy'))) == 1
+
+
+def test_triangulate_cached_unknown_backend(tmp_path):
+    """Test an unknown backend name is rejected."""
+    with pytest.raises(ValueError):
+        geometry.triangulate_cached(np.zeros((3, 2)), cache_dir=tmp_path, backend='cgal')
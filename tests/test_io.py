@@ -37,3 +37,101 @@ def test_load_csv_missing_file():
     """Test handling of missing file."""
     with pytest.raises(FileNotFoundError):
         io.load_csv('does_not_exist.csv')
+
+
+def test_load_csv_dtype_hints(tmp_path):
+    """Test that dtype and usecols are passed through to read_csv."""
+    path = tmp_path / 'points.csv'
+    path.write_text("NAME,LONGITUDE,LATITUDE,POPULATION\n"
+                    "a,-122.4194,37.7749,100000\n"
+                    "b,-118.2437,34.0522,200000\n")
+
+    df = io.load_csv(path, dtype={'LONGITUDE': np.float32, 'LATITUDE': np.float32},
+                     usecols=['LONGITUDE', 'LATITUDE', 'POPULATION'])
+
+    assert list(df.columns) == ['LONGITUDE', 'LATITUDE', 'POPULATION']
+    assert df['LONGITUDE'].dtype == np.float32
+    assert df['LATITUDE'].dtype == np.float32
+    assert df['LONGITUDE'].values[0] == pytest.approx(-122.4194, abs=1e-5)
+
+
+def test_load_potential_csv(tmp_path):
+    """Test reading the headerless potential CSV layout."""
+    path = tmp_path / 'potential.csv'
+    path.write_text("tract,1200,37.7749,-122.4194,1500.5\n"
+                    "tract,800,34.0522,-118.2437,900.25\n")
+
+    df = io.load_potential_csv(path, dtype={'lat': np.float32, 'lon': np.float32})
+
+    assert list(df.columns) == io.POTENTIAL_COLUMNS
+    assert df['lat'].dtype == np.float32
+    assert df['pop'].tolist() == [1200, 800]
+    assert df['potential'].values[1] == pytest.approx(900.25)
+
+
+def test_load_potential_csv_usecols(tmp_path):
+    """Test that usecols skips columns and keeps the remaining names."""
+    path = tmp_path / 'potential.csv'
+    path.write_text("tract,1200,37.7749,-122.4194,1500.5\n"
+                    "tract,800,34.0522,-118.2437,900.25\n")
+
+    df = io.load_potential_csv(path, usecols=['potential', 'lat', 'lon'],
+                               dtype={'lon': np.float32})
+
+    assert list(df.columns) == ['lat', 'lon', 'potential']
+    assert df['lon'].dtype == np.float32
+    assert df['lat'].values[0] == pytest.approx(37.7749)
+
+
+def test_write_rows_matches_savetxt(tmp_path):
+    """Test that write_rows produces the same text as np.savetxt."""
+    vertices = np.random.default_rng(0).uniform(-180, 180, (1001, 3))
+    faces = np.arange(30).reshape(10, 3) + 1
+
+    expected = tmp_path / 'expected.obj'
+    with open(expected, 'w') as f:
+        np.savetxt(f, vertices, fmt='v %.6f %.6f %.6f')
+        np.savetxt(f, faces, fmt='f %d %d %d')
+
+    written = tmp_path / 'written.obj'
+    with open(written, 'w') as f:
+        io.write_rows(f, vertices, 'v %.6f %.6f %.6f', chunk_rows=100)
+        io.write_rows(f, faces, 'f %d %d %d')
+
+    assert written.read_text() == expected.read_text()
+
+
+def test_load_numeric_csv_matches_loadtxt(tmp_path):
+    """Test load_numeric_csv against np.loadtxt, with and without the cache."""
+    csv_path = tmp_path / 'points.csv'
+    csv_path.write_text('longitude,latitude,potential\n'
+                        '-74.0,40.7,1.5e6\n'
+                        '-118.2,34.05,2.25e5\n')
+    expected = np.loadtxt(csv_path, delimiter=',', skiprows=1)
+
+    np.testing.assert_array_equal(io.load_numeric_csv(csv_path, skiprows=1), expected)
+    np.testing.assert_array_equal(io.load_numeric_csv(csv_path, skiprows=1, usecols=[0, 2]),
+                                  expected[:, [0, 2]])
+
+    first = io.load_numeric_csv(csv_path, skiprows=1, cache=True)
+    assert (tmp_path / 'points.csv.skip1.npy').exists()
+    cached = io.load_numeric_csv(csv_path, skiprows=1, cache=True)
+    np.testing.assert_array_equal(first, expected)
+    np.testing.assert_array_equal(cached, expected)
+
+
+def test_load_numeric_csv_cache_keyed_by_skiprows(tmp_path):
+    """Test cached loads with different skiprows do not share a cache file."""
+    csv_path = tmp_path / 'values.csv'
+    csv_path.write_text('1.0,2.0\n'
+                        '3.0,4.0\n'
+                        '5.0,6.0\n')
+    expected = np.loadtxt(csv_path, delimiter=',')
+
+    np.testing.assert_array_equal(io.load_numeric_csv(csv_path, skiprows=1, cache=True),
+                                  expected[1:])
+    np.testing.assert_array_equal(io.load_numeric_csv(csv_path, skiprows=0, cache=True),
+                                  expected)
+    np.testing.assert_array_equal(io.load_numeric_csv(csv_path, skiprows=1, cache=True),
+                                  expected[1:])
+
@@ -395,3 +395,219 @@ def test_min_distance_vs_no_smoothing():
     # 10000 / 0.02^3 = 125,000,000 vs 10000 / 1.0^3 = 10,000
     assert pot_no_smooth[0] > pot_smooth[0] * 100  # At least 100x difference
     assert pot_smooth[0] == pytest.approx(10000.0, rel=0.01)  # Clamped to 1 mile
+
+
+def test_calculate_potential_chunked_haversine_matches_dense():
+    """Test haversine path (JIT kernel when numba is installed) matches dense calculation."""
+    sample_lons = np.array([-122.02, -122.12, -122.22])
+    sample_lats = np.array([37.52, 37.62, 37.72])
+    source_lons = np.array([-122.0, -122.05, -122.1, -122.15, -121.0])
+    source_lats = np.array([37.5, 37.55, 37.6, 37.65, 38.5])
+    source_weights = np.array([1000.0, 2000.0, 1500.0, 3000.0, 5000.0])
+
+    pot_fast = potential.calculate_potential_chunked(
+        sample_lons, sample_lats,
+        source_lons, source_lats, source_weights,
+        geometry.haversine_distance,
+        force_exponent=3,
+        min_distance_miles=0.5,
+        max_distance_miles=50.0
+    )
+
+    distances = geometry.haversine_distance(sample_lons, sample_lats, source_lons, source_lats)
+    pot_dense = potential.calculate_potential(
+        distances, source_weights, force_exponent=3,
+        min_distance_miles=0.5, max_distance_miles=50.0
+    )
+
+    np.testing.assert_allclose(pot_fast, pot_dense, rtol=1e-10)
+
+    # Sampling exactly at sources without smoothing is still an error
+    with pytest.raises(ValueError, match="exactly match source point"):
+        potential.calculate_potential_chunked(
+            source_lons, source_lats, source_lons, source_lats, source_weights,
+            geometry.haversine_distance, force_exponent=3
+        )
+
+
+def test_calculate_potential_chunked_float32():
+    """Test float32 inputs give nearly the same result as float64."""
+    lons = np.array([-122.0, -122.05, -122.1, -122.15, -121.9])
+    lats = np.array([37.5, 37.55, 37.6, 37.65, 37.45])
+    weights = np.array([1000.0, 2000.0, 1500.0, 3000.0, 2500.0])
+
+    for distance_fn in (geometry.cos_corrected_distance, geometry.haversine_distance):
+        pot64 = potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn,
+            force_exponent=3, min_distance_miles=0.5
+        )
+        pot32 = potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn,
+            force_exponent=3, min_distance_miles=0.5, dtype=np.float32
+        )
+
+        assert pot32.dtype == np.float64  # Still accumulated in float64
+        np.testing.assert_allclose(pot32, pot64, rtol=1e-3)
+
+
+def test_calculate_potential_chunked_max_distance_pruning():
+    """Test KD-tree pruned max_distance path matches the dense calculation."""
+    rng = np.random.default_rng(42)
+    lons = rng.uniform(-124.0, -114.0, 400)
+    lats = rng.uniform(32.0, 42.0, 400)
+    weights = rng.uniform(100.0, 5000.0, 400)
+    avg_lat = np.mean(np.concatenate([lats, lats]))
+
+    pot_pruned = potential.calculate_potential_chunked(
+        lons, lats, lons, lats, weights,
+        geometry.cos_corrected_distance,
+        force_exponent=3, chunk_size=50,  # Many chunks, each with its own neighbors
+        min_distance_miles=1.0, max_distance_miles=60.0
+    )
+
+    distances = geometry.cos_corrected_distance(lons, lats, lons, lats, avg_lat)
+    pot_dense = potential.calculate_potential(
+        distances, weights, force_exponent=3,
+        min_distance_miles=1.0, max_distance_miles=60.0
+    )
+
+    np.testing.assert_allclose(pot_pruned, pot_dense, rtol=1e-10)
+
+
+def test_calculate_potential_chunked_force_exponents():
+    """Test chunked calculation matches dense for specialised and generic exponents."""
+    sample_lons = np.array([-122.02, -122.12, -122.22])
+    sample_lats = np.array([37.52, 37.62, 37.72])
+    source_lons = np.array([-122.0, -122.05, -122.1, -122.15])
+    source_lats = np.array([37.5, 37.55, 37.6, 37.65])
+    source_weights = np.array([1000.0, 2000.0, 1500.0, 3000.0])
+    distances = geometry.haversine_distance(sample_lons, sample_lats, source_lons, source_lats)
+
+    for force_exponent in (1, 2, 3, 4, 5):
+        pot_chunked = potential.calculate_potential_chunked(
+            sample_lons, sample_lats,
+            source_lons, source_lats, source_weights,
+            geometry.haversine_distance,
+            force_exponent=force_exponent
+        )
+        pot_dense = potential.calculate_potential(
+            distances, source_weights, force_exponent=force_exponent
+        )
+        np.testing.assert_allclose(pot_chunked, pot_dense, rtol=1e-10)
+
+
+def test_calculate_potential_chunked_self_symmetric():
+    """Test sampling at the sources (symmetric pair path) matches dense calculation."""
+    rng = np.random.default_rng(7)
+    lons = rng.uniform(-123.0, -121.0, 200)
+    lats = rng.uniform(37.0, 39.0, 200)
+    weights = rng.uniform(100.0, 5000.0, 200)
+    avg_lat = np.mean(np.concatenate([lats, lats]))
+
+    for distance_fn, distances in (
+        (geometry.haversine_distance, geometry.haversine_distance(lons, lats, lons, lats)),
+        (geometry.cos_corrected_distance, geometry.cos_corrected_distance(lons, lats, lons, lats, avg_lat)),
+    ):
+        pot_self = potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn,
+            force_exponent=3, min_distance_miles=0.5
+        )
+        pot_dense = potential.calculate_potential(
+            distances, weights, force_exponent=3, min_distance_miles=0.5
+        )
+        np.testing.assert_allclose(pot_self, pot_dense, rtol=1e-10)
+
+
+def test_calculate_potential_chunked_max_contribution():
+    """Test capped contributions match the dense calculation on every path."""
+    rng = np.random.default_rng(3)
+    lons = rng.uniform(-122.5, -121.5, 150)
+    lats = rng.uniform(37.0, 38.0, 150)
+    weights = rng.uniform(1000.0, 8000.0, 150)
+    avg_lat = np.mean(np.concatenate([lats, lats]))
+
+    def numpy_haversine(*args):
+        # Not one of the JIT distance functions, so the NumPy path is used
+        return geometry.haversine_distance(*args[:4])
+
+    cases = [
+        (geometry.haversine_distance, geometry.haversine_distance(lons, lats, lons, lats)),
+        (geometry.cos_corrected_distance,
+         geometry.cos_corrected_distance(lons, lats, lons, lats, avg_lat)),
+        (numpy_haversine, geometry.haversine_distance(lons, lats, lons, lats)),
+    ]
+    for distance_fn, distances in cases:
+        for max_distance in (None, 20.0):
+            kwargs = dict(force_exponent=3, min_distance_miles=0.5,
+                          max_distance_miles=max_distance, max_contribution=5000.0)
+            pot_dense = potential.calculate_potential(
+                distances, weights, force_exponent=3, min_distance_miles=0.5,
+                max_distance_miles=max_distance, max_contribution=5000.0
+            )
+            # Self (symmetric) and sample-vs-source kernels
+            pot_self = potential.calculate_potential_chunked(
+                lons, lats, lons, lats, weights, distance_fn, chunk_size=40, **kwargs
+            )
+            pot_split = potential.calculate_potential_chunked(
+                lons[:75], lats[:75], lons, lats, weights, distance_fn, chunk_size=40, **kwargs
+            )
+            np.testing.assert_allclose(pot_self, pot_dense, rtol=1e-10)
+            if distance_fn is not geometry.cos_corrected_distance:
+                # cos_corrected's avg_lat depends on the sample set
+                np.testing.assert_allclose(pot_split, pot_dense[:75], rtol=1e-10)
+
+    # The cap actually binds on this data
+    uncapped = potential.calculate_potential(distances, weights, min_distance_miles=0.5)
+    assert np.all(pot_dense < uncapped)
+
+
+def test_calculate_potential_chunked_process_pool():
+    """Test the NumPy path with worker processes matches the sequential run."""
+    rng = np.random.default_rng(11)
+    lons = rng.uniform(-123.0, -121.0, 300)
+    lats = rng.uniform(37.0, 39.0, 300)
+    weights = rng.uniform(100.0, 5000.0, 300)
+
+    # A wrapper is not one of the JIT distance functions, so this always
+    # exercises the NumPy chunked path
+    def distance_fn(lons1, lats1, lons2, lats2):
+        return geometry.haversine_distance(lons1, lats1, lons2, lats2)
+
+    pot_seq = potential.calculate_potential_chunked(
+        lons, lats, lons, lats, weights, distance_fn,
+        chunk_size=64, min_distance_miles=0.5, n_jobs=1
+    )
+    pot_par = potential.calculate_potential_chunked(
+        lons, lats, lons, lats, weights, distance_fn,
+        chunk_size=64, min_distance_miles=0.5, n_jobs=2
+    )
+    np.testing.assert_array_equal(pot_par, pot_seq)
+
+    with pytest.raises(ValueError, match="exactly match"):
+        potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn, n_jobs=2
+        )
+
+
+def test_calculate_potential_chunked_gpu_matches_cpu():
+    """Test CUDA kernel matches the CPU path (skipped without a CUDA device)."""
+    pytest.importorskip("numba")
+    from lib import gpu
+    if not gpu.is_available():
+        pytest.skip("CUDA device not available")
+
+    rng = np.random.default_rng(3)
+    lons = rng.uniform(-123.0, -121.0, 300)
+    lats = rng.uniform(37.0, 39.0, 300)
+    weights = rng.uniform(100.0, 5000.0, 300)
+
+    for distance_fn in (geometry.haversine_distance, geometry.cos_corrected_distance):
+        pot_cpu = potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn,
+            force_exponent=3, min_distance_miles=0.5
+        )
+        pot_gpu = potential.calculate_potential_chunked(
+            lons, lats, lons, lats, weights, distance_fn,
+            force_exponent=3, min_distance_miles=0.5, use_gpu=True
+        )
+        np.testing.assert_allclose(pot_gpu, pot_cpu, rtol=1e-6)
@@ -0,0 +1,81 @@
+"""Tests for 3D-print helpers."""
+import pytest
+import numpy as np
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import print3d
+
+
+def test_fit_to_base_width_constrained():
+    """Test a wide extent fills the base width."""
+    scale, width, height = print3d.fit_to_base(60.0, 20.0, 25.0, 15.0)
+
+    assert width == pytest.approx(25.0)
+    assert height == pytest.approx(25.0 / 3.0)
+    assert scale == pytest.approx(25.0 / 60.0)
+
+
+def test_fit_to_base_height_constrained():
+    """Test an extent wider than tall but narrower than the base fits its depth."""
+    scale, width, height = print3d.fit_to_base(20.0, 15.0, 25.0, 15.0)
+
+    assert height == pytest.approx(15.0)
+    assert width == pytest.approx(20.0)
+    assert width <= 25.0
+
+
+def test_normalize_height():
+    """Test values map linearly onto [0, max_z_cm]."""
+    values = np.array([[2.0, 4.0], [6.0, 10.0]])
+
+    z = print3d.normalize_height(values, 2.0)
+
+    assert z.dtype == np.float32
+    assert z.shape == values.shape
+    np.testing.assert_allclose(z, [[0.0, 0.5], [1.0, 2.0]])
+    np.testing.assert_array_equal(print3d.normalize_height(np.ones(3), 2.0), 0.0)
+
+
+def test_decimate_mesh_merges_close_vertices():
+    """Test that vertices in one cell merge and collapsed faces are dropped."""
+    vertices = np.array([[0.0, 0.0, 1.0],
+                         [0.01, 0.01, 3.0],  # same cell as vertex 0
+                         [1.0, 0.0, 0.0],
+                         [0.0, 1.0, 0.0],
+                         [1.0, 1.0, 0.0]])
+    faces = np.array([[0, 1, 2],   # collapses to an edge
+                      [0, 2, 3],
+                      [1, 2, 3],   # duplicate of the face above once merged
+                      [2, 4, 3]])
+
+    merged, kept = print3d.decimate_mesh(vertices, faces, cell_size=0.5)
+
+    assert len(merged) == 4
+    assert len(kept) == 2
+    # The merged vertex sits at the mean of its members
+    corner = merged[kept[0, 0]]
+    np.testing.assert_allclose(corner, [0.005, 0.005, 2.0])
+    np.testing.assert_allclose(merged[kept].reshape(-1, 3)[:, :2].max(axis=0), [1.0, 1.0])
+
+
+def test_write_stl(tmp_path):
+    """Test write_stl layout, triangle gather and unit normals across chunks."""
+    vertices = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 2.0]])
+    faces = np.array([[0, 1, 2], [1, 3, 2], [0, 0, 1]])
+    stl_path = tmp_path / 'mesh.stl'
+
+    print3d.write_stl(stl_path, vertices, faces, chunk_size=2)
+
+    raw = stl_path.read_bytes()
+    assert len(raw) == 84 + 50 * len(faces)
+    assert np.frombuffer(raw[80:84], dtype='<u4')[0] == len(faces)
+
+    records = np.frombuffer(raw[84:], dtype=print3d.STL_RECORD_DTYPE)
+    np.testing.assert_array_equal(records['vectors'], vertices[faces].astype(np.float32))
+    np.testing.assert_allclose(records['normal'][0], [0.0, 0.0, 1.0])
+    assert np.linalg.norm(records['normal'][1]) == pytest.approx(1.0)
+    np.testing.assert_array_equal(records['normal'][2], 0.0)
+    assert not records['attr'].any()
+